@@ -55,6 +55,7 @@ def safe_parse_dt(dt_str: str) -> Optional[datetime]:
 load_dotenv()
 
 http_client: Optional[httpx.AsyncClient] = None
+EXPO_PUSH_CONCURRENCY = 20  # Expo push requests in flight per send_expo_push_notification call
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -679,75 +680,82 @@ async def send_expo_push_notification(tokens: List[str], title: str, body: str,
     # Use a set to avoid duplicates
     unique_tokens = list(set(tokens))
     
-    for token in unique_tokens:
-        message = {
-            "to": token,
-            "sound": "default",
-            "title": title,
-            "body": body,
-            "data": data or {},
-            "badge": 1,
-            "priority": "high",
-            "channelId": "default",
-            "ttl": 2419200
-        }
+    # Tokens still go one per request (see above), but concurrently over the shared client -
+    # a push to N devices costs about one round trip instead of N
+    sem = asyncio.Semaphore(EXPO_PUSH_CONCURRENCY)
+
+    async def _send_one(token: str):
+        async with sem:
+            message = {
+                "to": token,
+                "sound": "default",
+                "title": title,
+                "body": body,
+                "data": data or {},
+                "badge": 1,
+                "priority": "high",
+                "channelId": "default",
+                "ttl": 2419200
+            }
 
-        try:
-            response = await http_client.post(
-                "https://exp.host/--/api/v2/push/send",
-                headers={
-                    "Accept": "application/json",
-                    "Content-Type": "application/json",
-                },
-                json=message
-            )
+            try:
+                response = await http_client.post(
+                    "https://exp.host/--/api/v2/push/send",
+                    headers={
+                        "Accept": "application/json",
+                        "Content-Type": "application/json",
+                    },
+                    json=message
+                )
             
-            if response.status_code != 200:
-                print(f"[PUSH] Expo error for token {token[:15]}...: {response.text}")
-            else:
-                resp_data = response.json()
-                # Expo returns a 'data' array with ticket info
-                # If there's an error with a specific token (like it being unregistered), it will be in there
-                push_resp = resp_data.get("data", {})
-                if isinstance(push_resp, dict): # Single token response
-                    if push_resp.get("status") == "error":
-                        details = push_resp.get("details", {})
-                        error_code = details.get("error")
+                if response.status_code != 200:
+                    print(f"[PUSH] Expo error for token {token[:15]}...: {response.text}")
+                else:
+                    resp_data = response.json()
+                    # Expo returns a 'data' array with ticket info
+                    # If there's an error with a specific token (like it being unregistered), it will be in there
+                    push_resp = resp_data.get("data", {})
+                    if isinstance(push_resp, dict): # Single token response
+                        if push_resp.get("status") == "error":
+                            details = push_resp.get("details", {})
+                            error_code = details.get("error")
                         
-                        if error_code == "DeviceNotRegistered":
-                            print(f"[PUSH] Stale Token Detected: {token[:20]}... Cleaning up from DB.")
-                            # Automated Cleanup: Find any user who has this token and remove it
-                            try:
-                                # We search users WHERE push_tokens contains the token
-                                # Supabase 'cs' (contains) operator for JSONB arrays
-                                search_response = await http_client.get(
-                                    f"{URL}/rest/v1/users?push_tokens=cs.%5B%22{token}%22%5D&select=id,push_tokens",
-                                    headers=HEADERS
-                                )
+                            if error_code == "DeviceNotRegistered":
+                                print(f"[PUSH] Stale Token Detected: {token[:20]}... Cleaning up from DB.")
+                                # Automated Cleanup: Find any user who has this token and remove it
+                                try:
+                                    # We search users WHERE push_tokens contains the token
+                                    # Supabase 'cs' (contains) operator for JSONB arrays
+                                    search_response = await http_client.get(
+                                        f"{URL}/rest/v1/users?push_tokens=cs.%5B%22{token}%22%5D&select=id,push_tokens",
+                                        headers=HEADERS
+                                    )
                                 
-                                if search_response.status_code == 200:
-                                    affected_users = search_response.json()
-                                    for user in affected_users:
-                                        uid = user.get("id")
-                                        utokens = user.get("push_tokens") or []
-                                        if token in utokens:
-                                            utokens.remove(token)
-                                            await http_client.patch(
-                                                f"{URL}/rest/v1/users?id=eq.{uid}",
-                                                headers=HEADERS,
-                                                json={"push_tokens": utokens}
-                                            )
-                                            print(f"[PUSH] Automatically removed stale token from user {uid}")
-                            except Exception as cleanup_err:
-                                print(f"[PUSH] Error during auto-cleanup: {cleanup_err}")
+                                    if search_response.status_code == 200:
+                                        affected_users = search_response.json()
+                                        for user in affected_users:
+                                            uid = user.get("id")
+                                            utokens = user.get("push_tokens") or []
+                                            if token in utokens:
+                                                utokens.remove(token)
+                                                await http_client.patch(
+                                                    f"{URL}/rest/v1/users?id=eq.{uid}",
+                                                    headers=HEADERS,
+                                                    json={"push_tokens": utokens}
+                                                )
+                                                print(f"[PUSH] Automatically removed stale token from user {uid}")
+                                except Exception as cleanup_err:
+                                    print(f"[PUSH] Error during auto-cleanup: {cleanup_err}")
                                 
-                        elif error_code == "InvalidCredentials":
-                            print(f"[PUSH] ALERT: InvalidCredentials for token {token[:20]}... (Check FCM V1 Config or Experience ID mismatch)")
-                        else:
-                            print(f"[PUSH] Token Error ({error_code}): {token[:20]}...")
+                            elif error_code == "InvalidCredentials":
+                                print(f"[PUSH] ALERT: InvalidCredentials for token {token[:20]}... (Check FCM V1 Config or Experience ID mismatch)")
+                            else:
+                                print(f"[PUSH] Token Error ({error_code}): {token[:20]}...")
 
-        except Exception as e:
-            print(f"[PUSH] Error sending to token {token[:15]}...: {e}")
+            except Exception as e:
+                print(f"[PUSH] Error sending to token {token[:15]}...: {e}")
+
+    await asyncio.gather(*(_send_one(token) for token in unique_tokens))
 
 
 # --- BOT USERS CACHE ---
@@ -1,23 +1,35 @@
 import os
 import time
+import calendar
+import heapq
 import json
+import orjson
 import logging
 import threading
+import atexit
 import traceback
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import httpx
 import random
 import asyncio
 import re
 import stripe
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto, BotCommand, BotCommandScopeChat, BotCommandScopeDefault
+from functools import lru_cache
+from types import MappingProxyType
+from collections import OrderedDict, deque
+from urllib.parse import urlsplit
+from telegram import Update, Message, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto, BotCommand, BotCommandScopeChat, BotCommandScopeDefault
 from telegram.constants import ParseMode
-from telegram.error import BadRequest
+from telegram.error import BadRequest, Forbidden, RetryAfter, TelegramError, TimedOut
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ContextTypes, ConversationHandler
 from bs4 import BeautifulSoup
 import supabase_utils
+from cache_utils import FeedCache
 from dotenv import load_dotenv
 from io import BytesIO
 from PIL import Image
@@ -29,6 +41,7 @@ load_dotenv()
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 # Support multiple admin IDs (comma-separated)
 ADMIN_USER_IDS = [id.strip() for id in os.getenv("TELEGRAM_ADMIN_ID", "").split(",") if id.strip()]
+_ADMIN_USER_ID_SET = frozenset(ADMIN_USER_IDS)  # O(1) superadmin checks
 # For backward compatibility
 ADMIN_USER_ID = ADMIN_USER_IDS[0] if ADMIN_USER_IDS else None
 SUPABASE_BUCKET = "monitor-data"
@@ -37,11 +50,67 @@ CODES_FILE = "active_codes.json"
 POLL_INTERVAL = 120
 MAX_JOB_RUNTIME = 110
 POTENTIAL_USERS_FILE = "potential_users.json"
+CURSOR_SAVE_DEBOUNCE = 15  # Seconds between poller cursor writes to bot_cursor
+RECENT_SIGNATURE_WINDOW = 20  # Content signatures kept for LAYER 2 dedup
+SENT_IDS_LIMIT = 5000  # Discord IDs kept for LAYER 1 dedup (oldest evicted first)
+POLL_BATCH_SIZE = int(os.getenv("POLL_BATCH_SIZE", "100"))  # Max discord_messages rows per poll
+REMINDER_INTERVAL = timedelta(days=14)  # Gap between expiry / potential-user reminders
+UNREACHABLE_RETRY = timedelta(days=7)  # Broadcasts skip a blocked/missing chat this long, then try it again
+STATE_SYNC_DEBOUNCE = 5  # Seconds to coalesce state mutations before uploading
+STATE_SYNC_MAX_BACKOFF = 300  # Cap on the retry delay while uploads keep failing (doubles per failed cycle)
+# Shared read-only fallbacks for missing raw_data/embed/fields - `.get(k, {})` allocates a dict per call
+_EMPTY_DICT = MappingProxyType({})
+_EMPTY_TUPLE = ()
 broadcast_lock = asyncio.Lock()
 job_start_time = None
 
 sync_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="sync_io")
 
+# Shared async HTTP client for image downloads and product page scraping.
+# Created lazily on the bot's event loop and closed on application shutdown.
+IMAGE_HTTP_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+try:
+    import h2  # noqa: F401 - httpx needs it for HTTP/2 (installed via httpx[http2])
+    IMAGE_HTTP2 = True  # Multiplex concurrent image/scrape requests over one connection per origin
+except ImportError:
+    IMAGE_HTTP2 = False
+IMAGE_HOST_CONCURRENCY = 3  # Max in-flight requests per retailer/CDN host (avoids 429 storms)
+HEADER_PROBE_BYTES = 64 * 1024  # How far into a download we try to read image dimensions
+TEST_ALERT_CONCURRENCY = 3  # /test messages formatted and sent at once
+FORMAT_CONCURRENCY = 4  # Broadcast messages formatted (image verify/scrape) at once
+REMINDER_SEND_CONCURRENCY = 25  # Reminder DMs in flight at once (Telegram allows ~30 msg/s per bot)
+BROADCAST_SEND_CONCURRENCY = int(os.getenv("BROADCAST_SEND_CONCURRENCY", "20"))  # Alert sends in flight per message
+# Bot-wide cap shared by broadcasts and reminders - each send holds a slot >= 1s, so this bounds total msg/s
+TELEGRAM_SEND_CONCURRENCY = 25
+# Bot API connection pool (getUpdates has its own). Must cover broadcast + reminder fan-out running at once
+TELEGRAM_POOL_SIZE = max(256, 2 * (BROADCAST_SEND_CONCURRENCY + REMINDER_SEND_CONCURRENCY))
+TELEGRAM_POOL_TIMEOUT = 10.0  # Seconds a send may wait for a free connection in a burst (PTB default is 1s)
+BROADCAST_PHOTO_TIMEOUT = 12.0  # Read/write timeout for an alert photo upload
+BROADCAST_TEXT_TIMEOUT = 10.0  # Read/write timeout for an alert text send
+_image_client: Optional[httpx.AsyncClient] = None
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+_telegram_send_sem: Optional[asyncio.Semaphore] = None
+# Scraped product images per page URL - repeated restock pings reuse the same links
+_scrape_cache = FeedCache(ttl_seconds=3600, max_entries=1024)
+_scrape_lock = threading.Lock()
+# Verified image downloads per normalized URL - the same product shots recur across a broadcast tick.
+# Bounded by total bytes (not entry count) since a single image may be up to 10MB
+IMAGE_CACHE_TTL = 600
+IMAGE_CACHE_MAX_BYTES = 48 * 1024 * 1024
+IMAGE_CACHE_MAX_ITEM_BYTES = 2 * 1024 * 1024  # Larger downloads are sent once and not kept
+_image_cache: "OrderedDict[str, Tuple[float, bytes, Tuple[int, int]]]" = OrderedDict()  # LRU, oldest first
+_image_cache_bytes = 0
+_image_cache_lock = threading.Lock()
+
+# Pooled session for synchronous Supabase/Telegram REST calls.
+# Reuses TCP+TLS connections across polls instead of a fresh handshake per request.
+http_session = requests.Session()
+http_session.mount('https://', HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=50,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     level=logging.INFO
@@ -56,28 +125,36 @@ def parse_iso_datetime(iso_string: str) -> datetime:
     if not iso_string:
         return datetime.utcnow()
     
+    parsed = _parse_iso_cached(iso_string)
+    return parsed if parsed is not None else datetime.utcnow()
+
+
+# Fractional seconds (any length) followed by an optional UTC offset at the end of the string
+_ISO_FRACTION_RE = re.compile(r'\.(\d+)(?=(?:[+-]\d{2}:?\d{2}|Z)?$)')
+
+def _pad_iso_fraction(match: re.Match) -> str:
+    return '.' + (match.group(1) + '000000')[:6]
+
+@lru_cache(maxsize=4096)
+def _parse_iso_cached(iso_string: str) -> Optional[datetime]:
+    """Memoized parse - stored expiry/reminder strings only change on writes."""
     try:
         return datetime.fromisoformat(iso_string)
     except ValueError:
+        # Older Pythons only accept exactly 3 or 6 fractional digits - normalize and retry
         try:
-            if "." in iso_string:
-                parts = iso_string.split(".")
-                if "+" in parts[1]:
-                    ms, tz = parts[1].split("+")
-                    ms = (ms + "000000")[:6]
-                    fixed_str = f"{parts[0]}.{ms}+{tz}"
-                elif "-" in parts[1] and parts[1].count("-") > 0:
-                    ms, tz = parts[1].rsplit("-", 1)
-                    ms = (ms + "000000")[:6]
-                    fixed_str = f"{parts[0]}.{ms}-{tz}"
-                else:
-                    ms = (parts[1] + "000000")[:6]
-                    fixed_str = f"{parts[0]}.{ms}"
-                return datetime.fromisoformat(fixed_str)
-        except:
-            pass
-    
-    return datetime.utcnow()
+            return datetime.fromisoformat(_ISO_FRACTION_RE.sub(_pad_iso_fraction, iso_string, count=1))
+        except ValueError:
+            return None
+
+def _parse_naive_utc(iso_string) -> Optional[datetime]:
+    """Parse a stored timestamp for ordering; None if missing or invalid, aware values become naive UTC."""
+    if not iso_string or not isinstance(iso_string, str):
+        return None
+    dt = _parse_iso_cached(iso_string)
+    if dt is not None and dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
 
 # --- LINK PARSING UTILITIES ---
 
@@ -99,23 +176,23 @@ def extract_markdown_links(text: str) -> List[Dict[str, str]]:
     return links
 
 
+_EBAY_LINK_RE = re.compile(r'sold|active|google|ebay', re.IGNORECASE)
+_FBA_LINK_RE = re.compile(r'keepa|amazon|selleramp|fba|camel', re.IGNORECASE)
+_BUY_LINK_RE = re.compile(r'buy|shop|purchase|checkout|cart', re.IGNORECASE)
+
 def categorize_links(links: List[Dict[str, str]]) -> Dict[str, List[Dict[str, str]]]:
     """Categorize links into eBay, FBA, Buy, Other"""
     categories = {'ebay': [], 'fba': [], 'buy': [], 'other': []}
     
-    ebay_keywords = ['sold', 'active', 'google', 'ebay']
-    fba_keywords = ['keepa', 'amazon', 'selleramp', 'fba', 'camel']
-    buy_keywords = ['buy', 'shop', 'purchase', 'checkout', 'cart']
-    
     for link in links:
-        text_lower = link['text'].lower()
-        url_lower = link['url'].lower()
+        # NUL separator stops a keyword from matching across the text/url boundary
+        blob = f"{link['text']}\x00{link['url']}"
         
-        if any(kw in text_lower or kw in url_lower for kw in ebay_keywords):
+        if _EBAY_LINK_RE.search(blob):
             categories['ebay'].append(link)
-        elif any(kw in text_lower or kw in url_lower for kw in fba_keywords):
+        elif _FBA_LINK_RE.search(blob):
             categories['fba'].append(link)
-        elif any(kw in text_lower or kw in url_lower for kw in buy_keywords):
+        elif _BUY_LINK_RE.search(blob):
             categories['buy'].append(link)
         else:
             categories['other'].append(link)
@@ -123,8 +200,50 @@ def categorize_links(links: List[Dict[str, str]]) -> Dict[str, List[Dict[str, st
     return categories
 
 
+# Embed link buckets keyed on the lowercased link text only, in priority order (ebay > fba > buy).
+# One lookahead alternation reports every keyword hit, overlapping ones included, in a single pass.
+_LINK_BUCKET_PRIORITY = {'ebay': 0, 'fba': 1, 'buy': 2}
+_LINK_TEXT_RE = re.compile(
+    r'(?=(?:(?P<ebay>sold|active|google|ebay)'
+    r'|(?P<fba>keepa|amazon|selleramp|camel)'
+    r'|(?P<buy>buy|shop|purchase|checkout|cart)))'
+)
+_ATC_FIELD_RE = re.compile(r'atc|qt')
+# Button emoji hints, matched case-insensitively on the cleaned link text at render time
+_SOLD_TEXT_RE = re.compile(r'sold', re.IGNORECASE)
+_KEEPA_TEXT_RE = re.compile(r'keepa', re.IGNORECASE)
+_QTY_RE = re.compile(r'\d+')
+
+def _link_text_bucket(text_lower: str) -> str:
+    best = 'other'
+    for m in _LINK_TEXT_RE.finditer(text_lower):
+        bucket = m.lastgroup
+        if bucket == 'ebay':
+            return bucket
+        if best == 'other' or _LINK_BUCKET_PRIORITY[bucket] < _LINK_BUCKET_PRIORITY[best]:
+            best = bucket
+    return best
+
+
 # --- IMPROVED IMAGE HANDLING ---
 
+# Keyword lists compiled once into single-pass alternations
+_NON_PRODUCT_PAGE_RE = re.compile('|'.join(map(re.escape, [
+    'keepa.com', 'ebay.com/sch', 'camelcamelcamel',
+    'login', 'cart', 'checkout', 'account', 'signin'
+])), re.IGNORECASE)
+# Link targets format_telegram_message never scrapes for images
+_SKIP_SCRAPE_RE = re.compile('|'.join(map(re.escape, [
+    'keepa.com', 'ebay.com/sch', 'login', 'cart', 'checkout'
+])), re.IGNORECASE)
+_IMG_SKIP_RE = re.compile('|'.join(map(re.escape, [
+    'logo', 'icon', 'banner', 'button', 'sprite', 'loading', 'placeholder', 'blank', 'ajax'
+])), re.IGNORECASE)
+_JSONLD_PRODUCT_MARKERS = ('"Product"', '"ItemPage"', '"IndividualProduct"')
+# Hosts whose images are always full-res (suffix match also covers m./ssl- subdomains)
+_TRUSTED_IMAGE_HOSTS = ('media-amazon.com', 'images-amazon.com', 'ebayimg.com')
+_THUMBNAIL_RE = re.compile(r'_sl160_|_ac_uy218_|s-l300|thumb|icon', re.IGNORECASE)
+
 def get_image_dimensions_from_url(url: str) -> Optional[Tuple[int, int]]:
     """
     Extract dimensions from Discord proxy URL parameters or estimate from URL patterns.
@@ -166,19 +285,14 @@ def is_high_quality_image(url: str, min_dimension: int = 160) -> bool:
     if not url:
         return False
     
-    # Trusted high-res domains - ALWAYS consider these high quality
-    trusted_domains = [
-        'media-amazon.com',
-        'images-amazon.com', 
-        'ssl-images-amazon.com',
-        'm.media-amazon.com',
-        'ebayimg.com'
-    ]
-    
-    url_lower = url.lower()
+    # Discord proxy URLs wrap the original: judge the upstream host instead
+    if "/https/" in url and "discordapp.net" in url:
+        host = urlsplit("https://" + url.split("/https/", 1)[1]).netloc.lower()
+    else:
+        host = urlsplit(url).netloc.lower()
     
-    # Check if it's from a trusted domain
-    is_trusted = any(domain in url_lower for domain in trusted_domains)
+    # Trusted high-res domains - ALWAYS consider these high quality
+    is_trusted = host.endswith(_TRUSTED_IMAGE_HOSTS)
     
     # Get dimensions if available
     dimensions = get_image_dimensions_from_url(url)
@@ -197,18 +311,14 @@ def is_high_quality_image(url: str, min_dimension: int = 160) -> bool:
     # If we can't determine dimensions but it's from a trusted domain, assume it's good
     if is_trusted:
         # But still reject obvious thumbnails
-        if any(pattern in url_lower for pattern in ['_sl160_', '_ac_uy218_', 's-l300', 'thumb', 'icon']):
-            return False
-        return True
+        return not _THUMBNAIL_RE.search(url)
     
-    # For non-Discord proxy URLs from unknown sources, we can't determine without downloading
+    # Unknown sources can't be judged without downloading
     # Conservative: return False to trigger scraping
-    if 'discordapp.net' not in url_lower:
-        return False
-    
     return False
 
 
+@lru_cache(maxsize=4096)
 def optimize_image_url(url: str) -> str:
     """
     Optimize image URLs to force maximum resolution.
@@ -266,17 +376,107 @@ def optimize_image_url(url: str) -> str:
         return url
 
 
-def download_image_high_quality(image_url: str, max_size_mb: int = 10) -> Optional[bytes]:
+def get_image_client() -> httpx.AsyncClient:
+    """Return the shared async HTTP client, creating it on first use."""
+    global _image_client
+    if _image_client is None or _image_client.is_closed:
+        _image_client = httpx.AsyncClient(limits=IMAGE_HTTP_LIMITS, http2=IMAGE_HTTP2, follow_redirects=True)
+    return _image_client
+
+
+def host_semaphore(url: str) -> asyncio.Semaphore:
+    """Per-host concurrency gate shared by image downloads and page scrapes."""
+    host = urlsplit(url).netloc.lower()
+    sem = _host_semaphores.get(host)
+    if sem is None:
+        sem = _host_semaphores[host] = asyncio.Semaphore(IMAGE_HOST_CONCURRENCY)
+    return sem
+
+
+def telegram_send_slots() -> asyncio.Semaphore:
+    """Bot-wide send gate, so a broadcast and a reminder sweep together stay under Telegram's ~30 msg/s."""
+    global _telegram_send_sem
+    if _telegram_send_sem is None:
+        _telegram_send_sem = asyncio.Semaphore(TELEGRAM_SEND_CONCURRENCY)
+    return _telegram_send_sem
+
+
+async def close_image_client(application: Optional[Application] = None) -> None:
+    """Close the shared image client and reset loop-bound send state (the bot's post_shutdown hook)."""
+    global _image_client, _telegram_send_sem
+    if _image_client is not None and not _image_client.is_closed:
+        await _image_client.aclose()
+    _image_client = None
+    # Semaphores bind to the loop that used them; a restarted bot gets fresh ones
+    # (and the send gate drops any slots cancelled sends were still holding)
+    _host_semaphores.clear()
+    _telegram_send_sem = None
+
+
+def _image_cache_get(key: str) -> Optional[Tuple[bytes, Tuple[int, int]]]:
+    """Cached (bytes, size) for a normalized image URL, or None if missing/expired"""
+    global _image_cache_bytes
+    with _image_cache_lock:
+        entry = _image_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, data, size = entry
+        if time.monotonic() - stored_at >= IMAGE_CACHE_TTL:
+            del _image_cache[key]
+            _image_cache_bytes -= len(data)
+            return None
+        _image_cache.move_to_end(key)
+        return data, size
+
+
+def _image_cache_put(key: str, data: bytes, size: Tuple[int, int]):
+    """Store a verified download, evicting least recently used entries past IMAGE_CACHE_MAX_BYTES"""
+    global _image_cache_bytes
+    if len(data) > IMAGE_CACHE_MAX_ITEM_BYTES:
+        return
+    with _image_cache_lock:
+        old = _image_cache.pop(key, None)
+        if old is not None:
+            _image_cache_bytes -= len(old[1])
+        _image_cache[key] = (time.monotonic(), data, size)
+        _image_cache_bytes += len(data)
+        evicted = 0
+        while _image_cache_bytes > IMAGE_CACHE_MAX_BYTES:
+            _, (_, dropped, _) = _image_cache.popitem(last=False)
+            _image_cache_bytes -= len(dropped)
+            evicted += 1
+    if evicted:
+        logger.debug(f"🧹 Image cache evicted {evicted} entries ({_image_cache_bytes // 1024}KB kept)")
+
+
+async def download_image_high_quality(image_url: str, max_size_mb: int = 10) -> Optional[bytes]:
     """
     Download image preserving maximum quality.
     Returns raw bytes without compression.
     """
+    result = await download_image_with_size(image_url, max_size_mb)
+    return result[0] if result else None
+
+
+async def download_image_with_size(image_url: str, max_size_mb: int = 10,
+                                   min_side: int = 0) -> Optional[Tuple[bytes, Tuple[int, int]]]:
+    """
+    Same as download_image_high_quality, plus the (width, height) Pillow read while verifying,
+    so callers that gate on resolution don't parse the image header a second time.
+    min_side: abort as soon as the header shows both sides below this, before the body downloads.
+    """
     if not image_url or not image_url.startswith('http'):
         return None
     
     # Optimize URL first to get best quality
     image_url = optimize_image_url(image_url)
     
+    parts = urlsplit(image_url)
+    cache_key = parts._replace(netloc=parts.netloc.lower()).geturl()
+    cached = _image_cache_get(cache_key)
+    if cached:
+        return cached
+    
     try:
         # Realistic headers to avoid 403 errors
         headers = {
@@ -297,40 +497,57 @@ def download_image_high_quality(image_url: str, max_size_mb: int = 10) -> Option
         elif 'ebay' in image_url:
             headers['Referer'] = 'https://www.ebay.com/'
         
-        response = requests.get(image_url, headers=headers, timeout=15, stream=True)
-        response.raise_for_status()
-        
-        # Check content type
-        content_type = response.headers.get('Content-Type', '')
-        if not content_type.startswith('image/'):
-            logger.warning(f"   ⚠️ Invalid content type: {content_type}")
-            return None
-        
-        # Download with size limit
-        max_size_bytes = max_size_mb * 1024 * 1024
-        downloaded = b''
-        
-        for chunk in response.iter_content(chunk_size=8192):
-            if chunk:
-                downloaded += chunk
-                if len(downloaded) > max_size_bytes:
-                    logger.warning(f"   ⚠️ Image too large (>{max_size_mb}MB)")
-                    return None
+        client = get_image_client()
+        async with host_semaphore(image_url), client.stream("GET", image_url, headers=headers, timeout=15) as response:
+            response.raise_for_status()
+            
+            # Check content type
+            content_type = response.headers.get('Content-Type', '')
+            if not content_type.startswith('image/'):
+                logger.warning(f"   ⚠️ Invalid content type: {content_type}")
+                return None
+            
+            # Download with size limit
+            max_size_bytes = max_size_mb * 1024 * 1024
+            buf = bytearray()
+            size = None
+            
+            async for chunk in response.aiter_bytes(chunk_size=8192):
+                if chunk:
+                    buf.extend(chunk)
+                    if len(buf) > max_size_bytes:
+                        logger.warning(f"   ⚠️ Image too large (>{max_size_mb}MB)")
+                        return None
+                    
+                    # Header probe: dimensions are known within the first few KB
+                    if min_side and size is None and len(buf) <= HEADER_PROBE_BYTES:
+                        try:
+                            size = Image.open(BytesIO(buf)).size
+                        except Exception:
+                            continue  # Header not complete yet
+                        if size[0] < min_side and size[1] < min_side:
+                            logger.info(f"   ⚠️ Low-res image ({size[0]}x{size[1]}) - skipped after {len(buf)//1024}KB")
+                            return None
         
         # Verify it's a valid image by trying to open it
+        # (Image.open only parses the header - pixel data is never decoded here)
         try:
-            img = Image.open(BytesIO(downloaded))
-            width, height = img.size
-            logger.info(f"   ✅ Downloaded image: {width}x{height} ({len(downloaded)//1024}KB)")
+            # One copy out of the bytearray; BytesIO over bytes shares the buffer
+            downloaded = bytes(buf)
+            if size is None:
+                size = Image.open(BytesIO(downloaded)).size
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"   ✅ Downloaded image: {size[0]}x{size[1]} ({len(downloaded)//1024}KB)")
             
             # CRITICAL: Return original bytes, DO NOT re-encode
-            return downloaded
+            _image_cache_put(cache_key, downloaded, size)
+            return downloaded, size
             
         except Exception as img_err:
             logger.warning(f"   ⚠️ Invalid image data: {img_err}")
             return None
         
-    except requests.exceptions.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         if e.response.status_code == 403:
             logger.warning(f"   🚫 403 Forbidden: {image_url[:80]}")
         elif e.response.status_code == 404:
@@ -339,7 +556,7 @@ def download_image_high_quality(image_url: str, max_size_mb: int = 10) -> Option
             logger.warning(f"   ⚠️ HTTP {e.response.status_code}: {image_url[:80]}")
         return None
         
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logger.warning(f"   ⏱️ Timeout downloading: {image_url[:80]}")
         return None
         
@@ -348,17 +565,149 @@ def download_image_high_quality(image_url: str, max_size_mb: int = 10) -> Option
         return None
 
 
-def fetch_product_images(url: str, max_images: int = 3) -> List[str]:
+def _extract_product_images(html: bytes, url: str) -> List[str]:
+    """Parse a product page and return candidate image URLs, best first.
+    CPU-bound (lxml + selector walks) - fetch_product_images runs it on sync_executor."""
+    images = []
+    
+    soup = BeautifulSoup(html, 'lxml')
+    
+    # Priority 0: Meta Tags
+    for meta in soup.find_all('meta'):
+        prop = meta.get('property', '')
+        name = meta.get('name', '')
+        if prop in ['og:image', 'twitter:image'] or name in ['og:image', 'twitter:image']:
+            meta_url = meta.get('content')
+            if meta_url:
+                if meta_url.startswith('//'):
+                    meta_url = 'https:' + meta_url
+                elif not meta_url.startswith('http'):
+                    from urllib.parse import urljoin
+                    meta_url = urljoin(url, meta_url)
+                
+                if meta_url.startswith('http') and not _IMG_SKIP_RE.search(meta_url):
+                    images.append({
+                        'url': meta_url,
+                        'alt': 'Meta Tag Image',
+                        'priority': 1000
+                    })
+    
+    # Priority 1: JSON-LD Structured Data
+    try:
+        scripts = soup.find_all('script', type='application/ld+json')
+        for script in scripts:
+            raw = script.string
+            # Cheap substring pre-check so Breadcrumb/Organization blobs are never json-parsed
+            if not raw or '"@type"' not in raw or not any(t in raw for t in _JSONLD_PRODUCT_MARKERS):
+                continue
+            try:
+                data = json.loads(raw)
+                items = []
+                if isinstance(data, list):
+                    items = data
+                elif isinstance(data, dict):
+                    if '@graph' in data:
+                        items.extend(data['@graph'])
+                    items.append(data)
+                
+                for item in items:
+                    if item.get('@type') in ['Product', 'ItemPage', 'IndividualProduct']:
+                        img_data = item.get('image')
+                        found_imgs = []
+                        
+                        if isinstance(img_data, str):
+                            found_imgs.append(img_data)
+                        elif isinstance(img_data, list):
+                            for i in img_data:
+                                if isinstance(i, str):
+                                    found_imgs.append(i)
+                                elif isinstance(i, dict) and 'url' in i:
+                                    found_imgs.append(i['url'])
+                        elif isinstance(img_data, dict) and 'url' in img_data:
+                            found_imgs.append(img_data['url'])
+                        
+                        for img_url in found_imgs:
+                            if img_url:
+                                if img_url.startswith('//'):
+                                    img_url = 'https:' + img_url
+                                elif not img_url.startswith('http'):
+                                    from urllib.parse import urljoin
+                                    img_url = urljoin(url, img_url)
+                                
+                                if img_url.startswith('http') and not _IMG_SKIP_RE.search(img_url):
+                                    images.append({
+                                        'url': img_url,
+                                        'alt': 'JSON-LD Image',
+                                        'priority': 950
+                                    })
+            except:
+                continue
+    except Exception as json_err:
+        logger.debug(f"   JSON-LD parse error: {json_err}")
+    
+    # Priority 2: Img Tags (only those carrying a usable source attribute)
+    for img in soup.select('img[src], img[data-src], img[data-lazy-src]'):
+        img_url = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
+        if not img_url:
+            continue
+        
+        if img_url.startswith('//'):
+            img_url = 'https:' + img_url
+        elif not img_url.startswith('http'):
+            from urllib.parse import urljoin
+            img_url = urljoin(url, img_url)
+        
+        if not img_url.startswith('http') or img_url.startswith('data:'):
+            continue
+        
+        # Size check
+        if 'width' in img.attrs and 'height' in img.attrs:
+            try:
+                w = int(str(img['width']).replace('px', ''))
+                h = int(str(img['height']).replace('px', ''))
+                if w < 100 or h < 100:
+                    continue
+            except:
+                pass
+        
+        if _IMG_SKIP_RE.search(img_url):
+            continue
+        
+        img_url_lower = img_url.lower()
+        
+        score = 0
+        alt_text = img.get('alt', '').lower()
+        if 'product' in img_url_lower or 'product' in alt_text:
+            score += 50
+        if 'main' in img_url_lower:
+            score += 20
+        if 'gallery' in img_url_lower:
+            score += 10
+        if 'cdn.shopify.com' in img_url_lower:
+            score += 30
+        
+        if score > 0:
+            images.append({'url': img_url, 'priority': score})
+    
+    # Sort and deduplicate
+    images.sort(key=lambda x: x['priority'], reverse=True)
+    seen = set()
+    final_images = []
+    
+    for img in images:
+        if img['url'] not in seen and img['url']:
+            seen.add(img['url'])
+            final_images.append(img['url'])
+    
+    return final_images
+
+
+async def fetch_product_images(url: str, max_images: int = 3) -> List[str]:
     """
     Scrape high-res product images from a URL with improved anti-blocking.
     """
     # Skip known non-product pages
-    skip_scrape = any(x in url.lower() for x in [
-        'keepa.com', 'ebay.com/sch', 'camelcamelcamel',
-        'login', 'cart', 'checkout', 'account', 'signin'
-    ])
-    
-    if skip_scrape:
+    if url and _NON_PRODUCT_PAGE_RE.search(url):
         logger.debug(f"   ⏭️ Skipping scrape of non-product page")
         return []
     
@@ -385,13 +734,18 @@ def fetch_product_images(url: str, max_images: int = 3) -> List[str]:
         'Cache-Control': 'max-age=0'
     }
     
-    images = []
-    
     try:
         if not url or not url.startswith('http'):
             return []
         
-        response = requests.get(url, headers=headers, timeout=12)
+        with _scrape_lock:
+            cached = _scrape_cache.get(url)
+        if cached is not None:
+            logger.debug(f"   📸 Using cached scrape ({len(cached)} image(s))")
+            return cached[:max_images]
+        
+        async with host_semaphore(url):
+            response = await get_image_client().get(url, headers=headers, timeout=12)
         
         if response.status_code == 403:
             logger.warning(f"   🚫 403 Forbidden - site blocking scraper")
@@ -401,141 +755,24 @@ def fetch_product_images(url: str, max_images: int = 3) -> List[str]:
             logger.warning(f"   ⚠️ Scrape failed: HTTP {response.status_code}")
             return []
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        skip_keywords = ['logo', 'icon', 'banner', 'button', 'sprite', 'loading', 'placeholder', 'blank', 'ajax']
-        
-        # Priority 0: Meta Tags
-        for meta in soup.find_all('meta'):
-            prop = meta.get('property', '')
-            name = meta.get('name', '')
-            if prop in ['og:image', 'twitter:image'] or name in ['og:image', 'twitter:image']:
-                meta_url = meta.get('content')
-                if meta_url:
-                    if meta_url.startswith('//'):
-                        meta_url = 'https:' + meta_url
-                    elif not meta_url.startswith('http'):
-                        from urllib.parse import urljoin
-                        meta_url = urljoin(url, meta_url)
-                    
-                    if meta_url.startswith('http') and not any(k in meta_url.lower() for k in skip_keywords):
-                        images.append({
-                            'url': meta_url,
-                            'alt': 'Meta Tag Image',
-                            'priority': 1000
-                        })
-        
-        # Priority 1: JSON-LD Structured Data
-        try:
-            scripts = soup.find_all('script', type='application/ld+json')
-            for script in scripts:
-                if script.string:
-                    try:
-                        data = json.loads(script.string)
-                        items = []
-                        if isinstance(data, list):
-                            items = data
-                        elif isinstance(data, dict):
-                            if '@graph' in data:
-                                items.extend(data['@graph'])
-                            items.append(data)
-                        
-                        for item in items:
-                            if item.get('@type') in ['Product', 'ItemPage', 'IndividualProduct']:
-                                img_data = item.get('image')
-                                found_imgs = []
-                                
-                                if isinstance(img_data, str):
-                                    found_imgs.append(img_data)
-                                elif isinstance(img_data, list):
-                                    for i in img_data:
-                                        if isinstance(i, str):
-                                            found_imgs.append(i)
-                                        elif isinstance(i, dict) and 'url' in i:
-                                            found_imgs.append(i['url'])
-                                elif isinstance(img_data, dict) and 'url' in img_data:
-                                    found_imgs.append(img_data['url'])
-                                
-                                for img_url in found_imgs:
-                                    if img_url:
-                                        if img_url.startswith('//'):
-                                            img_url = 'https:' + img_url
-                                        elif not img_url.startswith('http'):
-                                            from urllib.parse import urljoin
-                                            img_url = urljoin(url, img_url)
-                                        
-                                        if img_url.startswith('http') and not any(k in img_url.lower() for k in skip_keywords):
-                                            images.append({
-                                                'url': img_url,
-                                                'alt': 'JSON-LD Image',
-                                                'priority': 950
-                                            })
-                    except:
-                        continue
-        except Exception as json_err:
-            logger.debug(f"   JSON-LD parse error: {json_err}")
-        
-        # Priority 2: Img Tags
-        for img in soup.find_all('img'):
-            img_url = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
-            if not img_url:
-                continue
-            
-            if img_url.startswith('//'):
-                img_url = 'https:' + img_url
-            elif not img_url.startswith('http'):
-                from urllib.parse import urljoin
-                img_url = urljoin(url, img_url)
-            
-            if not img_url.startswith('http') or img_url.startswith('data:'):
-                continue
-            
-            # Size check
-            if 'width' in img.attrs and 'height' in img.attrs:
-                try:
-                    w = int(str(img['width']).replace('px', ''))
-                    h = int(str(img['height']).replace('px', ''))
-                    if w < 100 or h < 100:
-                        continue
-                except:
-                    pass
-            
-            img_url_lower = img_url.lower()
-            if any(skip in img_url_lower for skip in skip_keywords):
-                continue
-            
-            score = 0
-            alt_text = img.get('alt', '').lower()
-            if 'product' in img_url_lower or 'product' in alt_text:
-                score += 50
-            if 'main' in img_url_lower:
-                score += 20
-            if 'gallery' in img_url_lower:
-                score += 10
-            if 'cdn.shopify.com' in img_url_lower:
-                score += 30
-            
-            if score > 0:
-                images.append({'url': img_url, 'priority': score})
-        
-        # Sort and deduplicate
-        images.sort(key=lambda x: x['priority'], reverse=True)
-        seen = set()
-        final_images = []
-        
-        for img in images:
-            if img['url'] not in seen and img['url']:
-                seen.add(img['url'])
-                final_images.append(img['url'])
+        # Parsing a full retail page takes tens of ms - keep it off the event loop
+        final_images = await asyncio.get_running_loop().run_in_executor(
+            sync_executor, _extract_product_images, response.content, url
+        )
         
         if final_images:
             logger.info(f"   📸 Scraped {len(final_images)} image(s)")
         
+        # Only successful parses are cached; blocks and timeouts are retried next time
+        with _scrape_lock:
+            _scrape_cache.set(url, final_images)
+        
         return final_images[:max_images]
     
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logger.warning(f"   ⏱️ Scrape timeout")
         return []
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.warning(f"   ⚠️ Scrape error: {str(e)[:80]}")
         return []
     except Exception as e:
@@ -543,18 +780,29 @@ def fetch_product_images(url: str, max_images: int = 3) -> List[str]:
         return []
 
 
+# Keyword -> emoji, in priority order (first listed wins when several appear)
+_LINK_EMOJIS = {
+    'sold': '💰', 'active': '⚡', 'google': '🔍', 'ebay': '🛒',
+    'keepa': '📈', 'amazon': '🔎', 'selleramp': '💎', 'camel': '🐫',
+    'buy': '🛒', 'shop': '🪀', 'cart': '🛒', 'checkout': '✅',
+}
+_LINK_EMOJI_RANK = {keyword: i for i, keyword in enumerate(_LINK_EMOJIS)}
+# Zero-width lookahead so overlapping keywords all match (as _LINK_TEXT_RE does) - a plain alternation
+# would let "keepa" consume the "a" of "active" in "keepactive"
+_LINK_EMOJI_RE = re.compile('(?=(' + '|'.join(_LINK_EMOJIS) + '))', re.IGNORECASE)
+
 def add_emoji_to_link_text(text: str) -> str:
-    """Add emoji prefix to link text for better visual appeal"""
-    emojis = {
-        'sold': '💰', 'active': '⚡', 'google': '🔍', 'ebay': '🛒',
-        'keepa': '📈', 'amazon': '🔎', 'selleramp': '💎', 'camel': '🐫',
-        'buy': '🛒', 'shop': '🪀', 'cart': '🛒', 'checkout': '✅',
-    }
-    
-    text_lower = text.lower()
-    for keyword, emoji in emojis.items():
-        if keyword in text_lower:
-            return f"{emoji} {text}"
+    """Add emoji prefix to link text for better visual appeal
+
+    >>> add_emoji_to_link_text("keepactive")
+    '⚡ keepactive'
+    >>> add_emoji_to_link_text("Shopping Cart")
+    '🪀 Shopping Cart'
+    """
+    matches = _LINK_EMOJI_RE.findall(text)
+    if matches:
+        keyword = min((m.lower() for m in matches), key=_LINK_EMOJI_RANK.__getitem__)
+        return f"{_LINK_EMOJIS[keyword]} {text}"
     
     return f"🔗 {text}"
 
@@ -596,6 +844,22 @@ class SubscriptionManager:
         self.users: Dict[str, Dict] = {} 
         self.codes: Dict[str, int] = {}
         self.potential_users: Dict[str, Dict] = {}
+        # uid -> expiry for users currently receiving alerts (kept in sync on every mutation)
+        self._active_index: Dict[str, datetime] = {}
+        # (users dict it was built from, secondary admin ids). Any user change or reload publishes
+        # a new self.users, so an identity check is enough to invalidate it
+        self._admin_cache: Tuple[Optional[Dict], frozenset] = (None, frozenset())
+        # Same scheme for uid -> when a broadcast found the chat blocked/deleted ("unreachable_at")
+        self._unreachable_cache: Tuple[Optional[Dict], Dict[str, datetime]] = (None, {})
+        # Min-heaps of (reminder_due, uid) so reminder sweeps only touch users that are due.
+        # Entries are invalidated lazily: a popped entry is checked against the live record.
+        self._expiry_reminder_heap: List[Tuple[datetime, str]] = []
+        self._potential_reminder_heap: List[Tuple[datetime, str]] = []
+        # Guards only the two heaps. Sweeps take this (not self.lock) and validate against a
+        # snapshot of the copy-on-write dicts; writers nest it inside self.lock, never the reverse.
+        self._reminder_lock = threading.Lock()
+        # Serializes writers only. self.users, self.potential_users and self._active_index are copy-on-write:
+        # mutators publish a fresh dict, so readers take a reference and need no lock.
         self.lock = threading.Lock()
         self.remote_users_path = f"discord_josh/{USERS_FILE}"
         self.remote_codes_path = f"discord_josh/{CODES_FILE}"
@@ -607,6 +871,13 @@ class SubscriptionManager:
         # Persistence & Sync
         self.last_sync_time = 0
         self.sync_interval = 60 # Sync every 60s
+        # Debounced writer: mutators only mark state dirty, a background thread uploads
+        self._dirty = {"users": False, "codes": False, "potential": False}
+        self._sync_event = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._generation = 0  # Bumped on every mutation; lets a reload detect it raced a write
+        self._sync_failures = 0  # Consecutive flush cycles with a failed upload (drives backoff and log rate)
         
         # Stripe Config
         self.stripe_price_id_monthly = os.getenv("STRIPE_PRICE_ID_MONTHLY")
@@ -615,68 +886,223 @@ class SubscriptionManager:
         
         os.makedirs("data", exist_ok=True)
         self._load_state()
+        
+        threading.Thread(target=self._sync_loop, daemon=True, name="SubscriptionSync").start()
+        atexit.register(self.flush)
 
     def reload(self, force=False):
-        """Reload user state from Supabase if stale or forced"""
+        """Reload user state from Supabase if stale or forced.
+        Stale (non-forced) reloads run in the background so callers never wait on Supabase.
+        Files with unsaved local changes are kept as they are (local wins until an upload succeeds);
+        the others are still refreshed, so a failing upload doesn't freeze every file."""
         now = time.time()
         if not force and (now - self.last_sync_time) < self.sync_interval:
             return
-            
-        logger.info("🔄 Reloading user state from Supabase...")
-        self._load_state()
+        # An upload in flight has cleared its dirty flag already - wait for it to settle
+        if self._flush_lock.locked():
+            return
+        if not self._reload_lock.acquire(blocking=False):
+            return  # Already reloading
         self.last_sync_time = now
+        
+        if force:
+            self._reload_worker()
+        else:
+            threading.Thread(target=self._reload_worker, daemon=True, name="SubscriptionReload").start()
+
+    def _reload_worker(self):
+        try:
+            logger.info("🔄 Reloading user state from Supabase...")
+            self._load_state()
+        finally:
+            self._reload_lock.release()
 
     def _load_state(self):
         """Load state from Supabase with local fallback"""
-        users_loaded = False
+        # Fetch all three files concurrently
+        downloads = {
+            name: sync_executor.submit(supabase_utils.download_file, local_path, remote_path, SUPABASE_BUCKET)
+            for name, local_path, remote_path in (
+                ("users", self.local_users_path, self.remote_users_path),
+                ("codes", self.local_codes_path, self.remote_codes_path),
+                ("potential", self.local_potential_path, self.remote_potential_path),
+            )
+        }
+        generation = self._generation
+        users = codes = potential_users = None
+        
         try:
-            data = supabase_utils.download_file(self.local_users_path, self.remote_users_path, SUPABASE_BUCKET)
+            data = downloads["users"].result()
             if data: 
-                self.users = json.loads(data)
-                users_loaded = True
-                logger.info(f"✅ Loaded {len(self.users)} users from Supabase")
+                users = orjson.loads(data)
+                logger.info(f"✅ Loaded {len(users)} users from Supabase")
         except Exception as e:
             logger.warning(f"⚠️ Failed to download users from Supabase: {e}")
 
-        if not users_loaded and os.path.exists(self.local_users_path):
+        if users is None and os.path.exists(self.local_users_path):
             try:
-                with open(self.local_users_path, 'r') as f:
-                    self.users = json.load(f)
-                logger.info(f"📂 Loaded {len(self.users)} users from local fallback")
+                with open(self.local_users_path, 'rb') as f:
+                    users = orjson.loads(f.read())
+                logger.info(f"📂 Loaded {len(users)} users from local fallback")
             except Exception as e:
                 logger.error(f"❌ Failed to load local users fallback: {e}")
 
         # Load Codes
-        codes_loaded = False
         try:
-            data = supabase_utils.download_file(self.local_codes_path, self.remote_codes_path, SUPABASE_BUCKET)
+            data = downloads["codes"].result()
             if data:
-                self.codes = json.loads(data)
-                codes_loaded = True
+                codes = orjson.loads(data)
         except Exception as e:
             logger.warning(f"⚠️ Failed to download codes from Supabase: {e}")
 
-        if not codes_loaded and os.path.exists(self.local_codes_path):
+        if codes is None and os.path.exists(self.local_codes_path):
             try:
-                with open(self.local_codes_path, 'r') as f:
-                    self.codes = json.load(f)
+                with open(self.local_codes_path, 'rb') as f:
+                    codes = orjson.loads(f.read())
             except: pass
 
         # Load Potential Users
-        potential_loaded = False
         try:
-            data = supabase_utils.download_file(self.local_potential_path, self.remote_potential_path, SUPABASE_BUCKET)
+            data = downloads["potential"].result()
             if data:
-                self.potential_users = json.loads(data)
-                potential_loaded = True
+                potential_users = orjson.loads(data)
         except: pass
 
-        if not potential_loaded and os.path.exists(self.local_potential_path):
+        if potential_users is None and os.path.exists(self.local_potential_path):
             try:
-                with open(self.local_potential_path, 'r') as f:
-                    self.potential_users = json.load(f)
+                with open(self.local_potential_path, 'rb') as f:
+                    potential_users = orjson.loads(f.read())
             except: pass
 
+        with self.lock:
+            # A mutation landed while we were downloading - local state is newer
+            if self._generation != generation:
+                return
+            # Never overwrite local mutations that haven't been uploaded yet
+            if users is not None and not self._dirty["users"]: self.users = users
+            if codes is not None and not self._dirty["codes"]: self.codes = codes
+            if potential_users is not None and not self._dirty["potential"]: self.potential_users = potential_users
+            self._rebuild_active_index()
+            self._rebuild_reminder_heaps()
+
+    def _rebuild_active_index(self):
+        """Rebuild the index of users eligible for alerts (parses every expiry once)"""
+        now = datetime.utcnow()
+        active = {}
+        for uid, data in self.users.items():
+            # Naive UTC - Google Play renewals store offset-aware expiries, which can't compare to utcnow()
+            expiry = _parse_naive_utc(data.get("expiry"))
+            if expiry is not None and expiry > now and not data.get("alerts_paused", False):
+                active[uid] = expiry
+        self._active_index = active
+
+    def _refresh_active(self, uids: Iterable[str]):
+        """Update the active index for the given users after a mutation (one copy per call)"""
+        now = datetime.utcnow()
+        index = dict(self._active_index)
+        for uid in uids:
+            data = self.users.get(uid)
+            expiry = _parse_naive_utc(data.get("expiry")) if data else None
+            if expiry and expiry > now and not data.get("alerts_paused", False):
+                index[uid] = expiry
+            else:
+                index.pop(uid, None)
+        self._active_index = index
+
+    def _put_user(self, uid: str, user_data: Dict):
+        """Publish a user record (caller holds self.lock).
+        Never mutate a record in place - copy it, change the copy, then put it here."""
+        self._put_users({uid: user_data})
+
+    def _put_users(self, updates: Dict[str, Dict]):
+        """Publish several user records with a single copy of the users dict (caller holds self.lock)"""
+        if not updates:
+            return
+        old_users = self.users
+        users = dict(old_users)
+        users.update(updates)
+        self.users = users
+        self._refresh_active(updates)
+        
+        with self._reminder_lock:
+            for uid, user_data in updates.items():
+                old_data = old_users.get(uid)
+                due = self._expiry_reminder_due(user_data)
+                if due is not None and (old_data is None or due != self._expiry_reminder_due(old_data)):
+                    heapq.heappush(self._expiry_reminder_heap, (due, uid))
+
+    def _put_potential(self, uid: str, data: Dict):
+        """Publish a potential-user record (caller holds self.lock) - same rules as _put_user"""
+        self._put_potentials({uid: data})
+
+    def _put_potentials(self, updates: Dict[str, Dict]):
+        """Publish several potential-user records with one copy (caller holds self.lock)"""
+        if not updates:
+            return
+        potential = dict(self.potential_users)
+        potential.update(updates)
+        self.potential_users = potential
+        for uid in updates:
+            self._push_potential_due(uid)
+
+    def _drop_potential(self, uid: str):
+        """Remove a potential user once they subscribe (caller holds self.lock)"""
+        if uid in self.potential_users:
+            potential = dict(self.potential_users)
+            del potential[uid]
+            self.potential_users = potential
+
+    @staticmethod
+    def _expiry_reminder_due(data: Dict) -> Optional[datetime]:
+        """When a user next needs an expiry reminder: at expiry, or 14 days after the last one"""
+        expiry = _parse_naive_utc(data.get("expiry"))
+        if expiry is None:
+            return None
+        last_reminder = _parse_naive_utc(data.get("last_expiry_reminder"))
+        return max(expiry, last_reminder + REMINDER_INTERVAL) if last_reminder else expiry
+
+    @staticmethod
+    def _potential_reminder_due(data: Dict) -> Optional[datetime]:
+        """14 days after the last reminder, or after first_seen if never reminded"""
+        since = _parse_naive_utc(data.get("last_reminder")) or _parse_naive_utc(data.get("first_seen"))
+        return since + REMINDER_INTERVAL if since else None
+
+    @staticmethod
+    def _build_due_heap(records: Dict[str, Dict], due_fn) -> List[Tuple[datetime, str]]:
+        heap = []
+        for uid, data in records.items():
+            due = due_fn(data)
+            if due is not None:
+                heap.append((due, uid))
+        heapq.heapify(heap)
+        return heap
+
+    def _rebuild_reminder_heaps(self):
+        expiry_heap = self._build_due_heap(self.users, self._expiry_reminder_due)
+        potential_heap = self._build_due_heap(self.potential_users, self._potential_reminder_due)
+        with self._reminder_lock:
+            self._expiry_reminder_heap = expiry_heap
+            self._potential_reminder_heap = potential_heap
+
+    @staticmethod
+    def _collect_due(heap: List[Tuple[datetime, str]], records: Dict[str, Dict], due_fn, now: datetime) -> List[str]:
+        """Pop every entry due by now (caller holds self._reminder_lock; records is a snapshot).
+        Stale entries (record removed or its due time changed since the push) and duplicates
+        are dropped; valid ones go back on the heap so an unsent reminder is retried next sweep."""
+        due_uids, keep, seen = [], [], set()
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            due, uid = entry
+            data = records.get(uid)
+            if data is None or uid in seen or due_fn(data) != due:
+                continue
+            seen.add(uid)
+            due_uids.append(uid)
+            keep.append(entry)
+        for entry in keep:
+            heapq.heappush(heap, entry)
+        return due_uids
+
     def get_user_categories(self, user_id: str) -> List[str]:
         """Get enabled categories for a user (default to all if not set)"""
         uid = str(user_id)
@@ -717,20 +1143,22 @@ class SubscriptionManager:
         with self.lock:
             uid = str(user_id)
             if uid not in self.users: return False
-            
-            if "subscribed_categories" not in self.users[uid]:
-                self.users[uid]["subscribed_categories"] = cm.get_categories()
-                
-            current_cats = self.users[uid]["subscribed_categories"]
+
+            user_data = dict(self.users[uid])
+            if "subscribed_categories" not in user_data:
+                user_data["subscribed_categories"] = cm.get_categories()
+
+            current_cats = list(user_data["subscribed_categories"])
             if category in current_cats:
                 current_cats.remove(category)
                 new_state = False
             else:
                 current_cats.append(category)
                 new_state = True
-            
-            self.users[uid]["subscribed_categories"] = current_cats
-            self._sync_state()
+
+            user_data["subscribed_categories"] = current_cats
+            self._put_user(uid, user_data)
+            self._sync_state("users")
             return new_state
 
     def toggle_subcategory(self, user_id: str, category: str, subcategory: str) -> bool:
@@ -738,11 +1166,9 @@ class SubscriptionManager:
         with self.lock:
             uid = str(user_id)
             if uid not in self.users: return False
-            
-            if "disabled_subcategories" not in self.users[uid]:
-                self.users[uid]["disabled_subcategories"] = []
-                
-            disabled_subs = self.users[uid]["disabled_subcategories"]
+
+            user_data = dict(self.users[uid])
+            disabled_subs = list(user_data.get("disabled_subcategories", []))
             sub_key = f"{category}:{subcategory}"
             
             if sub_key in disabled_subs:
@@ -752,43 +1178,104 @@ class SubscriptionManager:
                 disabled_subs.append(sub_key)
                 new_state = False # Now disabled
                 
-            self.users[uid]["disabled_subcategories"] = disabled_subs
-            self._sync_state()
+            user_data["disabled_subcategories"] = disabled_subs
+            self._put_user(uid, user_data)
+            self._sync_state("users")
             return new_state
 
-    def _sync_state(self):
-        try:
-            with open(self.local_users_path, 'w') as f: json.dump(self.users, f)
-            supabase_utils.upload_file(self.local_users_path, SUPABASE_BUCKET, self.remote_users_path, debug=False)
-            with open(self.local_codes_path, 'w') as f: json.dump(self.codes, f)
-            supabase_utils.upload_file(self.local_codes_path, SUPABASE_BUCKET, self.remote_codes_path, debug=False)
-            with open(self.local_potential_path, 'w') as f: json.dump(self.potential_users, f)
-            supabase_utils.upload_file(self.local_potential_path, SUPABASE_BUCKET, self.remote_potential_path, debug=False)
-        except Exception as e:
-            logger.error(f"Sync error: {e}")
+    def _sync_state(self, *targets: str):
+        """Mark state as changed; the background writer persists it shortly after.
+        targets: any of "users", "codes", "potential" (default: all)"""
+        for target in targets or self._dirty.keys():
+            self._dirty[target] = True
+        self._generation += 1
+        self._sync_event.set()
+
+    def _sync_loop(self):
+        """Background writer - coalesces bursts of mutations into one upload per file"""
+        while True:
+            self._sync_event.wait()
+            # Back off while uploads keep failing: 5s, 10s, 20s... up to STATE_SYNC_MAX_BACKOFF
+            time.sleep(min(STATE_SYNC_DEBOUNCE * 2 ** min(self._sync_failures, 10), STATE_SYNC_MAX_BACKOFF))
+            self.flush()
+
+    def flush(self):
+        """Write and upload all dirty state files now"""
+        with self._flush_lock:
+            with self.lock:
+                self._sync_event.clear()
+                files = {
+                    "users": (self.users, self.local_users_path, self.remote_users_path),
+                    "codes": (self.codes, self.local_codes_path, self.remote_codes_path),
+                    "potential": (self.potential_users, self.local_potential_path, self.remote_potential_path),
+                }
+                # Serialize under the lock, do the disk/network I/O outside it
+                pending = {}
+                for target, dirty in self._dirty.items():
+                    if dirty:
+                        data, local_path, remote_path = files[target]
+                        pending[target] = (orjson.dumps(data), local_path, remote_path)
+                        self._dirty[target] = False
+            
+            # Upload the dirty files in parallel rather than one round-trip after another
+            uploads = {}
+            for target, args in pending.items():
+                try:
+                    uploads[target] = sync_executor.submit(self._write_and_upload, *args)
+                except RuntimeError:
+                    # Executor refuses new work during interpreter shutdown (atexit flush)
+                    uploads[target] = None
+            errors = []
+            for target, future in uploads.items():
+                try:
+                    uploaded = future.result() if future else self._write_and_upload(*pending[target])
+                    if not uploaded:
+                        raise RuntimeError("upload rejected")
+                except Exception as e:
+                    errors.append(f"{target}: {e}")
+                    # Retry on the next cycle
+                    self._dirty[target] = True
+                    self._sync_event.set()
+            
+            if errors:
+                self._sync_failures += 1
+                failures = self._sync_failures
+                # Log the 1st, 2nd, 4th, 8th... consecutive failure; the rest only at debug
+                level = logging.ERROR if failures & (failures - 1) == 0 else logging.DEBUG
+                logger.log(level, f"Sync error ({'; '.join(errors)}) - attempt {failures}, "
+                                  f"unsaved files keep local state and skip reloads until an upload succeeds")
+            elif pending and self._sync_failures:
+                logger.info(f"✅ State sync recovered after {self._sync_failures} failed attempt(s)")
+                self._sync_failures = 0
+
+    @staticmethod
+    def _write_and_upload(payload: bytes, local_path: str, remote_path: str) -> bool:
+        with open(local_path, 'wb') as f: f.write(payload)
+        return supabase_utils.upload_file(local_path, SUPABASE_BUCKET, remote_path, debug=False)
 
     def generate_code(self, days: int) -> str:
         import secrets
         code = secrets.token_hex(4).upper()
         with self.lock:
             self.codes[code] = days
-            self._sync_state()
+            self._sync_state("codes")
         return code
 
     def redeem_code(self, user_id: str, username: str, code: str) -> bool:
         with self.lock:
+            uid = str(user_id)
             if code not in self.codes: return False
             days = self.codes.pop(code)
             current_expiry = datetime.utcnow()
-            if str(user_id) in self.users:
+            if uid in self.users:
                 try:
-                    old_expiry = parse_iso_datetime(self.users[str(user_id)]["expiry"])
+                    old_expiry = parse_iso_datetime(self.users[uid]["expiry"])
                     if old_expiry > datetime.utcnow(): current_expiry = old_expiry
                 except: pass
             
             new_expiry = current_expiry + timedelta(days=days)
             # Retrieve existing data or initialize new
-            user_data = self.users.get(str(user_id), {})
+            user_data = dict(self.users.get(uid, {}))
             
             # Update fields
             user_data["expiry"] = new_expiry.isoformat()
@@ -798,15 +1285,14 @@ class SubscriptionManager:
             if "joined_at" not in user_data:
                 user_data["joined_at"] = datetime.utcnow().isoformat()
             
-            self.users[str(user_id)] = user_data
-            if str(user_id) in self.potential_users:
-                self.potential_users.pop(str(user_id))
+            self._put_user(uid, user_data)
+            self._drop_potential(uid)
             self._sync_state()
 
             # Sync to Supabase SQL (2-way sync with Mobile App)
             try:
                 if hasattr(supabase_utils, 'sync_telegram_premium_to_app'):
-                    supabase_utils.sync_telegram_premium_to_app(str(user_id), new_expiry.isoformat())
+                    supabase_utils.sync_telegram_premium_to_app(uid, new_expiry.isoformat())
                     logger.info(f"🔄 Synced premium for {user_id} to Supabase SQL")
             except Exception as se:
                 logger.warning(f"⚠️ Failed to sync premium to Supabase: {se}")
@@ -838,20 +1324,22 @@ class SubscriptionManager:
             if user_id:
                 with self.lock:
                     uid = str(user_id)
-                    if uid not in self.users:
+                    if uid in self.users:
+                        user_data = dict(self.users[uid])
+                    else:
                         # Create user entry if it doesn't exist
-                        self.users[uid] = {
+                        user_data = {
                             "expiry": (datetime.utcnow() + timedelta(days=days_to_add)).isoformat(),
                             "username": data_object.get('customer_details', {}).get('name', 'Stripe User'),
                             "joined_at": datetime.utcnow().isoformat(),
                             "alerts_paused": False
                         }
-                    
-                    self.users[uid]["stripe_customer_id"] = customer_id
-                    self.users[uid]["stripe_subscription_id"] = subscription_id
-                    
+
+                    user_data["stripe_customer_id"] = customer_id
+                    user_data["stripe_subscription_id"] = subscription_id
+
                     # Set expiry based on plan (Extend if active, otherwise start fresh)
-                    current_expiry_str = self.users[uid].get("expiry")
+                    current_expiry_str = user_data.get("expiry")
                     now = datetime.utcnow()
                     base_date = now
                     
@@ -864,12 +1352,11 @@ class SubscriptionManager:
                         except: pass
 
                     new_expiry = base_date + timedelta(days=days_to_add)
-                    self.users[uid]["expiry"] = new_expiry.isoformat()
-                    
-                    if uid in self.potential_users:
-                        self.potential_users.pop(uid)
+                    user_data["expiry"] = new_expiry.isoformat()
+                    self._put_user(uid, user_data)
+                    self._drop_potential(uid)
                     
-                    self._sync_state()
+                    self._sync_state("users", "potential")
                     
                     # Sync to Supabase SQL (2-way sync with Mobile App)
                     try:
@@ -891,7 +1378,7 @@ Your payment was successful and your subscription is now <b>Active</b> for the n
 """
                     try:
                         api_url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-                        requests.post(api_url, json={"chat_id": uid, "text": success_msg, "parse_mode": "HTML"}, timeout=10)
+                        http_session.post(api_url, json={"chat_id": uid, "text": success_msg, "parse_mode": "HTML"}, timeout=10)
                     except Exception as e:
                         logger.warning(f"Failed to send confirmation to {uid}: {e}")
         
@@ -914,8 +1401,8 @@ Your payment was successful and your subscription is now <b>Active</b> for the n
                     for uid, udata in self.users.items():
                         if udata.get('stripe_customer_id') == customer_id:
                             new_expiry = datetime.utcnow() + timedelta(days=days_to_add)
-                            self.users[uid]["expiry"] = new_expiry.isoformat()
-                            self._sync_state()
+                            self._put_user(uid, {**udata, "expiry": new_expiry.isoformat()})
+                            self._sync_state("users")
                             
                             # Sync to Supabase SQL (2-way sync with Mobile App)
                             try:
@@ -930,7 +1417,7 @@ Your payment was successful and your subscription is now <b>Active</b> for the n
                             renew_msg = f"✅ <b>Subscription Renewed!</b>\n\nYour premium access has been extended. Thank you for staying with us!"
                             try:
                                 api_url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-                                requests.post(api_url, json={"chat_id": uid, "text": renew_msg, "parse_mode": "HTML"}, timeout=10)
+                                http_session.post(api_url, json={"chat_id": uid, "text": renew_msg, "parse_mode": "HTML"}, timeout=10)
                             except: pass
                             break
                             
@@ -943,8 +1430,8 @@ Your payment was successful and your subscription is now <b>Active</b> for the n
                         if udata.get('stripe_customer_id') == customer_id:
                             # Immediate expiry or let it run out? 
                             # Stripe usually sends this when it FINALLY ends.
-                            self.users[uid]["expiry"] = datetime.utcnow().isoformat()
-                            self._sync_state()
+                            self._put_user(uid, {**udata, "expiry": datetime.utcnow().isoformat()})
+                            self._sync_state("users")
                             
                             # Sync to Supabase SQL (2-way sync with Mobile App)
                             try:
@@ -958,77 +1445,86 @@ Your payment was successful and your subscription is now <b>Active</b> for the n
 
     def get_active_users(self) -> List[str]:
         self.reload()
-        active = []
         now = datetime.utcnow()
-        with self.lock:
-            for uid, data in self.users.items():
-                try:
-                    if parse_iso_datetime(data["expiry"]) > now:
-                        if not data.get("alerts_paused", False):
-                            active.append(uid)
-                except: pass
-        return active
-    
+        # Expiry is checked on read; stale entries drop out on the next index rebuild
+        return [uid for uid, expiry in self._active_index.items() if expiry > now]
+
     def get_all_users(self) -> List[str]:
         """Get all known users (subscribed + potential)"""
-        all_ids = set()
-        with self.lock:
-            all_ids.update(self.users.keys())
-            all_ids.update(self.potential_users.keys())
+        all_ids = set(self.users)
+        all_ids.update(self.potential_users)
         return list(all_ids)
 
     def get_expired_users(self) -> List[str]:
         """Get users with expired subscriptions"""
         expired = []
         now = datetime.utcnow()
-        with self.lock:
-            for uid, data in self.users.items():
-                try:
-                    expiry = parse_iso_datetime(data["expiry"])
-                    if expiry < now:
-                        expired.append(uid)
-                except: 
-                    pass
+        for uid, data in self.users.items():
+            try:
+                expiry = parse_iso_datetime(data["expiry"])
+                if expiry < now:
+                    expired.append(uid)
+            except:
+                pass
         return expired
 
     def get_potential_users_list(self) -> List[str]:
         """Get list of potential users"""
-        with self.lock:
-            return list(self.potential_users.keys())
+        return list(self.potential_users)
     
     def get_expiry(self, user_id: str):
         return self.users.get(str(user_id), {}).get("expiry")
     
-    def is_active(self, user_id: str) -> bool:
+    def is_active(self, user_id: str, now: Optional[datetime] = None) -> bool:
+        """now: pass one timestamp when checking many users in a row"""
         self.reload()
-        expiry = self.get_expiry(str(user_id))
+        expiry = self.get_expiry(user_id)
         if not expiry: return False
         try:
-            return parse_iso_datetime(expiry) > datetime.utcnow()
+            return parse_iso_datetime(expiry) > (now or datetime.utcnow())
         except:
             return False
     
     def toggle_pause(self, user_id: str) -> bool:
         """Toggle pause status, returns new paused state"""
         with self.lock:
-            if str(user_id) not in self.users:
+            uid = str(user_id)
+            if uid not in self.users:
                 return False
-            current = self.users[str(user_id)].get("alerts_paused", False)
-            self.users[str(user_id)]["alerts_paused"] = not current
-            self._sync_state()
+            current = self.users[uid].get("alerts_paused", False)
+            self._put_user(uid, {**self.users[uid], "alerts_paused": not current})
+            self._sync_state("users")
             return not current
     
-    def get_user_stats(self, user_id: str) -> Dict:
+    def get_user_stats(self, user_id: str, now: Optional[datetime] = None) -> Dict:
         """Get user statistics"""
         user_data = self.users.get(str(user_id), {})
         if not user_data:
             return None
-        
-        expiry = parse_iso_datetime(user_data["expiry"])
-        joined = parse_iso_datetime(user_data.get("joined_at", datetime.utcnow().isoformat()))
+        return self._build_stats(user_data, now or datetime.utcnow())[1]
+    
+    def get_user_snapshot(self, user_id: str) -> Dict:
+        """is_active plus get_user_stats fields from one read of the user record.
+        Unknown users or unparseable expiries come back as {"is_active": False}."""
+        self.reload()
+        user_data = self.users.get(str(user_id))
+        if not user_data:
+            return {"is_active": False}
         now = datetime.utcnow()
+        try:
+            expiry, snapshot = self._build_stats(user_data, now)
+        except:
+            return {"is_active": False}
+        snapshot["is_active"] = expiry > now
+        return snapshot
+    
+    def _build_stats(self, user_data: Dict, now: datetime) -> Tuple[datetime, Dict]:
+        expiry = parse_iso_datetime(user_data["expiry"])
+        # Missing joined_at counts as "now" - no need to format and re-parse a timestamp
+        joined_at = user_data.get("joined_at")
+        joined = parse_iso_datetime(joined_at) if joined_at else now
         
-        return {
+        return expiry, {
             "username": user_data.get("username", "Unknown"),
             "days_remaining": (expiry - now).days if expiry > now else 0,
             "days_active": (now - joined).days,
@@ -1040,69 +1536,114 @@ Your payment was successful and your subscription is now <b>Active</b> for the n
     def add_admin(self, user_id: str) -> bool:
         """Set a user as admin"""
         with self.lock:
-            if str(user_id) not in self.users:
+            uid = str(user_id)
+            if uid not in self.users:
                 # Add a placeholder user if they don't exist yet? 
                 # Or just error out. Let's assume they must be in the system.
                 return False
-            self.users[str(user_id)]["is_admin"] = True
-            self._sync_state()
+            self._put_user(uid, {**self.users[uid], "is_admin": True})
+            self._sync_state("users")
             return True
 
     def remove_admin(self, user_id: str) -> bool:
         """Remove admin status from a user"""
         with self.lock:
-            if str(user_id) in self.users:
-                self.users[str(user_id)]["is_admin"] = False
-                self._sync_state()
+            uid = str(user_id)
+            if uid in self.users:
+                self._put_user(uid, {**self.users[uid], "is_admin": False})
+                self._sync_state("users")
                 return True
             return False
 
+    @property
+    def bot_admin_ids(self) -> frozenset:
+        """Secondary admin ids, rebuilt only when self.users has been replaced"""
+        users = self.users
+        cached_users, admin_ids = self._admin_cache
+        if cached_users is not users:
+            admin_ids = frozenset(uid for uid, data in users.items() if data.get("is_admin"))
+            self._admin_cache = (users, admin_ids)
+        return admin_ids
+
+    def mark_unreachable(self, user_id: str):
+        """Record that the bot can't reach this chat (blocked / deleted) - persisted with the user"""
+        self.mark_unreachable_many([user_id])
+
+    def mark_unreachable_many(self, user_ids: Iterable[str]):
+        """mark_unreachable for a batch - one users-dict copy for all of them (used by broadcasts)"""
+        now_iso = datetime.utcnow().isoformat()
+        with self.lock:
+            updates = {
+                uid: {**self.users[uid], "unreachable_at": now_iso}
+                for uid in map(str, user_ids) if uid in self.users
+            }
+            if updates:
+                self._put_users(updates)
+                self._sync_state("users")
+
+    def clear_unreachable(self, user_id: str):
+        """The user contacted the bot again, so broadcasts can reach them"""
+        uid = str(user_id)
+        if "unreachable_at" not in self.users.get(uid, _EMPTY_DICT):
+            return  # Common case - no lock, no write
+        with self.lock:
+            if uid in self.users:
+                user_data = dict(self.users[uid])
+                user_data.pop("unreachable_at", None)
+                self._put_user(uid, user_data)
+                self._sync_state("users")
+
+    def is_unreachable(self, user_id: str, now: Optional[datetime] = None) -> bool:
+        """True while a recorded block is younger than UNREACHABLE_RETRY; after that the chat gets
+        retried (and re-marked if still blocked). now: pass one timestamp when checking many users."""
+        users = self.users
+        cached_users, marked = self._unreachable_cache
+        if cached_users is not users:
+            marked = {}
+            for uid, data in users.items():
+                ts = data.get("unreachable_at")
+                if ts:
+                    try:
+                        marked[uid] = parse_iso_datetime(ts)
+                    except:
+                        pass
+            self._unreachable_cache = (users, marked)
+        since = marked.get(str(user_id))
+        return since is not None and (now or datetime.utcnow()) - since < UNREACHABLE_RETRY
+
     def is_bot_admin(self, user_id: str) -> bool:
         """Check if a user is a secondary admin"""
-        return self.users.get(str(user_id), {}).get("is_admin", False)
+        return str(user_id) in self.bot_admin_ids
 
     def get_all_admins(self) -> List[str]:
         """Get list of all admin IDs (Superadmin + Secondary)"""
         admins = [str(ADMIN_USER_ID)]
-        with self.lock:
-            for uid, data in self.users.items():
-                if data.get("is_admin"):
-                    if uid not in admins:
-                        admins.append(uid)
+        admins.extend(uid for uid in self.bot_admin_ids if uid != admins[0])
         return admins
 
     def get_expired_users_needing_reminder(self) -> List[str]:
         """Get users with expired subscriptions who haven't been reminded in 14 days"""
-        needing_reminder = []
         now = datetime.utcnow()
-        with self.lock:
-            for uid, data in self.users.items():
-                try:
-                    expiry = parse_iso_datetime(data["expiry"])
-                    if expiry < now:
-                        last_reminder_str = data.get("last_expiry_reminder")
-                        should_remind = False
-                        
-                        if not last_reminder_str:
-                            should_remind = True
-                        else:
-                            last_reminder = parse_iso_datetime(last_reminder_str)
-                            if (now - last_reminder).days >= 14:
-                                should_remind = True
-                        
-                        if should_remind:
-                            needing_reminder.append(uid)
-                except Exception as e:
-                    logger.error(f"Error checking reminder for {uid}: {e}")
-        return needing_reminder
+        users = self.users  # Snapshot - writers publish a new dict, never mutate this one
+        with self._reminder_lock:
+            return self._collect_due(self._expiry_reminder_heap, users, self._expiry_reminder_due, now)
 
-    def update_reminder_timestamp(self, user_id: str):
+    def update_reminder_timestamp(self, user_id: str, now_iso: Optional[str] = None):
         """Update last_expiry_reminder timestamp only and sync to Supabase"""
+        self.update_reminder_timestamps([user_id], now_iso)
+
+    def update_reminder_timestamps(self, user_ids: Iterable[str], now_iso: Optional[str] = None):
+        """update_reminder_timestamp for a whole reminder sweep, with one users-dict copy.
+        now_iso: the sweep's timestamp, so a batch doesn't format one per user"""
+        now_iso = now_iso or datetime.utcnow().isoformat()
         with self.lock:
-            uid = str(user_id)
-            if uid in self.users:
-                self.users[uid]["last_expiry_reminder"] = datetime.utcnow().isoformat()
-                self._sync_state()
+            updates = {
+                uid: {**self.users[uid], "last_expiry_reminder": now_iso}
+                for uid in map(str, user_ids) if uid in self.users
+            }
+            if updates:
+                self._put_users(updates)
+                self._sync_state("users")
 
     def track_potential_user(self, user_id: str, username: str):
         """Track user who ran /start but isn't subscribed"""
@@ -1110,38 +1651,43 @@ Your payment was successful and your subscription is now <b>Active</b> for the n
             uid = str(user_id)
             # Only add if not an active user and not already in potential list
             if uid not in self.users and uid not in self.potential_users:
-                self.potential_users[uid] = {
+                self._put_potential(uid, {
                     "username": username or "Unknown",
                     "first_seen": datetime.utcnow().isoformat(),
                     "last_reminder": None
-                }
-                self._sync_state()
+                })
+                self._sync_state("potential")
 
     def get_potential_users_needing_reminder(self) -> List[str]:
         """Get potential users who haven't been reminded in 14 days"""
-        needing_reminder = []
+        # First reminder 14 days after joining, then every 14 days
         now = datetime.utcnow()
-        with self.lock:
-            for uid, data in self.potential_users.items():
-                last_reminder_str = data.get("last_reminder")
-                if not last_reminder_str:
-                    # First reminder after 14 days of joining
-                    first_seen = parse_iso_datetime(data["first_seen"])
-                    if (now - first_seen).days >= 14:
-                        needing_reminder.append(uid)
-                else:
-                    last_reminder = parse_iso_datetime(last_reminder_str)
-                    if (now - last_reminder).days >= 14:
-                        needing_reminder.append(uid)
-        return needing_reminder
+        potential = self.potential_users  # Snapshot, as above
+        with self._reminder_lock:
+            return self._collect_due(self._potential_reminder_heap, potential, self._potential_reminder_due, now)
 
-    def update_potential_reminder_timestamp(self, user_id: str):
+    def update_potential_reminder_timestamp(self, user_id: str, now_iso: Optional[str] = None):
         """Update last_reminder timestamp for potential user"""
+        self.update_potential_reminder_timestamps([user_id], now_iso)
+
+    def update_potential_reminder_timestamps(self, user_ids: Iterable[str], now_iso: Optional[str] = None):
+        """update_potential_reminder_timestamp for a whole reminder sweep, with one dict copy"""
+        now_iso = now_iso or datetime.utcnow().isoformat()
         with self.lock:
-            uid = str(user_id)
-            if uid in self.potential_users:
-                self.potential_users[uid]["last_reminder"] = datetime.utcnow().isoformat()
-                self._sync_state()
+            updates = {
+                uid: {**self.potential_users[uid], "last_reminder": now_iso}
+                for uid in map(str, user_ids) if uid in self.potential_users
+            }
+            if updates:
+                self._put_potentials(updates)
+                self._sync_state("potential")
+
+    def _push_potential_due(self, uid: str):
+        """Index a potential user's next reminder (caller holds self.lock)"""
+        due = self._potential_reminder_due(self.potential_users[uid])
+        if due is not None:
+            with self._reminder_lock:
+                heapq.heappush(self._potential_reminder_heap, (due, uid))
 
     def revoke_premium(self, user_id: str) -> bool:
         """Immediately revoke premium status (used for unlinking)"""
@@ -1149,21 +1695,58 @@ Your payment was successful and your subscription is now <b>Active</b> for the n
             uid = str(user_id)
             if uid in self.users:
                 # Set expiry to now or past to deactivate
-                self.users[uid]["expiry"] = datetime.utcnow().isoformat()
+                user_data = dict(self.users[uid])
+                user_data["expiry"] = datetime.utcnow().isoformat()
                 # Clear stripe/payment identifiers to prevent auto-renewal logic from finding them
-                if "stripe_customer_id" in self.users[uid]:
-                    del self.users[uid]["stripe_customer_id"]
-                if "stripe_subscription_id" in self.users[uid]:
-                    del self.users[uid]["stripe_subscription_id"]
-                
-                self._sync_state()
+                user_data.pop("stripe_customer_id", None)
+                user_data.pop("stripe_subscription_id", None)
+
+                self._put_user(uid, user_data)
+                self._sync_state("users")
                 logger.info(f"🛑 Premium REVOKED for {uid} due to unlinking")
                 return True
             return False
 
+    def clear_stripe_ids(self, user_id: str):
+        """Drop stale Stripe customer/subscription ids without touching expiry"""
+        with self.lock:
+            uid = str(user_id)
+            if uid in self.users:
+                user_data = dict(self.users[uid])
+                user_data.pop("stripe_customer_id", None)
+                user_data.pop("stripe_subscription_id", None)
+                self._put_user(uid, user_data)
+                self._sync_state("users")
+
 
 # --- MESSAGE POLLER ---
 
+_SIG_PRICE_RE = re.compile(r'[£$€]\s*[\d,]+\.?\d*')
+# "blake2s" (default) or "md5" - the legacy hash, to keep matching signatures persisted by older builds
+SIGNATURE_HASH = os.getenv("SIGNATURE_HASH", "blake2s").lower()
+
+@lru_cache(maxsize=2048)
+def _signature_hash(text: str) -> str:
+    """Hash a normalized signature - the same retailer/title/price repeats across restocks"""
+    if SIGNATURE_HASH == "md5":
+        return hashlib.md5(text.encode()).hexdigest()
+    return hashlib.blake2s(text.encode(), digest_size=16).hexdigest()
+
+def _field_view(msg_data: Dict) -> Tuple[Tuple[str, str, str], ...]:
+    """(name, name_lower, value) per embed field.
+    The signature builder and both source filters scan the same fields, so the view is built
+    once and cached on the message dict (messages live for a single poll/broadcast cycle)."""
+    view = msg_data.get("_field_view")
+    if view is None:
+        embed = (msg_data.get("raw_data") or _EMPTY_DICT).get("embed") or _EMPTY_DICT
+        rows = []
+        for f in embed.get("fields") or _EMPTY_TUPLE:
+            name = f.get("name") or ""
+            rows.append((name, name.lower(), f.get("value") or ""))
+        view = tuple(rows)
+        msg_data["_field_view"] = view
+    return view
+
 class MessagePoller:
     """
     OPTIMIZED VERSION - Uses database table instead of storage
@@ -1172,17 +1755,44 @@ class MessagePoller:
     
     def __init__(self):
         self.last_scraped_at = None
-        self.sent_ids = set()
-        self.recent_signatures = []  # Last 20 sent content signatures
+        self.sent_ids = OrderedDict()  # msg_id -> None, insertion-ordered LRU capped at SENT_IDS_LIMIT
+        self._sent_total = 0  # Monotonic count of marked IDs; len(sent_ids) plateaus at the cap
+        self.recent_signatures = deque(maxlen=RECENT_SIGNATURE_WINDOW)  # Last 20 sent content signatures
         self.supabase_url, self.supabase_key = supabase_utils.get_supabase_config()
-        self.time_based_signatures = {}  # {sig_hash: timestamp_iso}
+        self.time_based_signatures = {}  # {sig_hash: unix_seconds} - ISO only in the DB row
         
         # State tracking to avoid unnecessary saves
         self._last_saved_state = None
         self._save_counter = 0  # Track number of saves
         
+        # Debounced writer: the poll path only requests a save, a background thread PATCHes
+        self.lock = threading.Lock()
+        self._save_event = threading.Event()
+        self._save_forced = False
+        self._sync_started = False
+        
         self._init_cursor()
 
+    def start_sync(self):
+        """
+        Start the CursorSync writer and the exit flush - only in the process that runs the poller,
+        so other importers never PATCH their stale copy of the cursor
+        """
+        with self.lock:
+            if self._sync_started:
+                return
+            self._sync_started = True
+        threading.Thread(target=self._save_loop, daemon=True, name="CursorSync").start()
+        atexit.register(self.flush)
+
+    def _state_fingerprint(self) -> Dict:
+        """Cheap change fingerprint compared before each save"""
+        return {
+            "last_scraped_at": self.last_scraped_at,
+            "sent_count": self._sent_total,
+            "sig_count": len(self.recent_signatures)
+        }
+
     def _init_cursor(self):
         """Load cursor from database bot_cursor table"""
         try:
@@ -1193,7 +1803,7 @@ class MessagePoller:
             }
             
             # Fetch from bot_cursor table (should only have 1 row with id=1)
-            res = requests.get(
+            res = http_session.get(
                 f"{self.supabase_url}/rest/v1/bot_cursor?id=eq.1",
                 headers=headers,
                 timeout=10
@@ -1203,13 +1813,16 @@ class MessagePoller:
                 data = res.json()[0]
                 self.last_scraped_at = data.get("last_scraped_at")
                 
-                # Load sent_ids (convert from JSONB array to set)
-                sent_ids_list = data.get("sent_ids", [])
-                self.sent_ids = set(str(x) for x in sent_ids_list)
+                # Load sent_ids (JSONB array, oldest first)
+                sent_ids_list = data.get("sent_ids") or []
+                self.sent_ids = OrderedDict.fromkeys(str(x) for x in sent_ids_list[-SENT_IDS_LIMIT:])
                 
                 # Load signatures
-                self.recent_signatures = data.get("recent_signatures", [])
-                self.time_based_signatures = data.get("time_based_signatures", {})
+                self._set_recent_signatures(data.get("recent_signatures") or [])
+                self.time_based_signatures = self._sigs_from_iso(data.get("time_based_signatures") or {})
+                
+                # Loaded state matches the DB row - nothing to save until the poller changes it
+                self._last_saved_state = self._state_fingerprint()
                 
                 logger.info(f"✅ Cursor loaded from DB: {len(self.sent_ids)} sent IDs, "
                            f"last_scraped: {self.last_scraped_at}")
@@ -1224,32 +1837,58 @@ class MessagePoller:
     def _initialize_new_cursor(self):
         """Initialize cursor when no data exists"""
         self.last_scraped_at = (datetime.utcnow() - timedelta(hours=24)).isoformat()
-        self.sent_ids = set()
-        self.recent_signatures = []
+        self.sent_ids = OrderedDict()
+        self._set_recent_signatures([])
         self.time_based_signatures = {}
         
         # Save initial state to database
         self._save_cursor(force=True)
 
     def _save_cursor(self, force: bool = False):
+        """
+        Request a cursor save; the CursorSync thread performs it within CURSOR_SAVE_DEBOUNCE seconds
+        
+        force=True writes even if the change fingerprint is unchanged
+        """
+        if force:
+            self._save_forced = True
+        self._save_event.set()
+
+    def _save_loop(self):
+        """Background writer - coalesces the saves of consecutive polls into one PATCH"""
+        while True:
+            self._save_event.wait()
+            time.sleep(CURSOR_SAVE_DEBOUNCE)
+            self.flush()
+
+    def flush(self):
         """
         Save cursor to database (single UPDATE operation)
         
-        OPTIMIZATION: Only saves if state actually changed OR force=True
+        OPTIMIZATION: Only saves if state actually changed OR a save was forced
         This reduces unnecessary writes significantly
         """
         try:
-            # Create current state snapshot
-            current_state = {
-                "last_scraped_at": self.last_scraped_at,
-                "sent_count": len(self.sent_ids),
-                "sig_count": len(self.recent_signatures)
-            }
-            
-            # Skip save if nothing changed (unless forced)
-            if not force and current_state == self._last_saved_state:
-                logger.debug("⏭️ Skipping cursor save - no changes")
-                return
+            with self.lock:
+                self._save_event.clear()
+                force, self._save_forced = self._save_forced, False
+                
+                # Create current state snapshot
+                current_state = self._state_fingerprint()
+                
+                # Skip save if nothing changed (unless forced)
+                if not force and current_state == self._last_saved_state:
+                    logger.debug("⏭️ Skipping cursor save - no changes")
+                    return
+                
+                # Prepare payload - keep arrays limited to prevent bloat
+                payload = {
+                    "last_scraped_at": self.last_scraped_at,
+                    "sent_ids": list(self.sent_ids),  # Already bounded to the newest SENT_IDS_LIMIT
+                    "recent_signatures": list(self.recent_signatures),  # deque keeps only the last 20
+                    "time_based_signatures": self._sigs_to_iso(self.time_based_signatures),
+                    # updated_at is auto-updated by trigger
+                }
             
             headers = {
                 "apikey": self.supabase_key, 
@@ -1258,17 +1897,8 @@ class MessagePoller:
                 "Prefer": "return=minimal"  # Don't return the updated row
             }
             
-            # Prepare payload - keep arrays limited to prevent bloat
-            payload = {
-                "last_scraped_at": self.last_scraped_at,
-                "sent_ids": list(self.sent_ids)[-5000:],  # Keep last 5000 IDs
-                "recent_signatures": self.recent_signatures[-20:],  # Keep last 20
-                "time_based_signatures": self.time_based_signatures,
-                # updated_at is auto-updated by trigger
-            }
-            
             # Single UPDATE operation (NOT INSERT - much more efficient!)
-            res = requests.patch(
+            res = http_session.patch(
                 f"{self.supabase_url}/rest/v1/bot_cursor?id=eq.1",
                 headers=headers,
                 json=payload,
@@ -1281,16 +1911,57 @@ class MessagePoller:
                 logger.info(f"💾 Cursor saved to DB (save #{self._save_counter})")
             else:
                 logger.error(f"❌ Failed to save cursor: {res.status_code} - {res.text[:200]}")
+                self._save_cursor(force)
                 
         except Exception as e:
             logger.error(f"❌ Error saving cursor to DB: {e}")
-            # Don't crash - cursor will be saved next time
+            # Don't crash - retried on the next cycle
+            self._save_cursor(force)
+
+    def _mark_sent(self, msg_id: str):
+        """Record a Discord ID as handled, evicting the oldest past SENT_IDS_LIMIT"""
+        self.sent_ids[msg_id] = None
+        self.sent_ids.move_to_end(msg_id)
+        self._sent_total += 1
+        while len(self.sent_ids) > SENT_IDS_LIMIT:
+            self.sent_ids.popitem(last=False)
+
+    def _set_recent_signatures(self, sigs: List[str]):
+        self.recent_signatures = deque(sigs, maxlen=RECENT_SIGNATURE_WINDOW)
+
+    def _remember_signature(self, sig: str) -> Optional[str]:
+        """Push onto the sliding window; returns the signature it evicted, if any"""
+        evicted = None
+        if len(self.recent_signatures) == self.recent_signatures.maxlen:
+            evicted = self.recent_signatures[0]
+        self.recent_signatures.append(sig)
+        return evicted
+
+    def _build_dedup_index(self) -> Dict[str, int]:
+        """sig -> blocking layer (2 = sliding window, 3 = 10m window) for one probe per message"""
+        index = dict.fromkeys(self.time_based_signatures, 3)
+        index.update(dict.fromkeys(self.recent_signatures, 2))
+        return index
+
+    @staticmethod
+    def _sigs_from_iso(sigs: Dict[str, str]) -> Dict[str, float]:
+        """Parse stored ISO timestamps once on load (naive strings are UTC)"""
+        parsed = {}
+        for sig_hash, ts in sigs.items():
+            dt = _parse_iso_cached(ts) if isinstance(ts, str) else None
+            if dt is not None:
+                parsed[sig_hash] = calendar.timegm(dt.utctimetuple()) + dt.microsecond / 1e6
+        return parsed
+
+    @staticmethod
+    def _sigs_to_iso(sigs: Dict[str, float]) -> Dict[str, str]:
+        return {sig_hash: datetime.utcfromtimestamp(ts).isoformat() for sig_hash, ts in sigs.items()}
 
     def _get_content_signature(self, msg: Dict) -> str:
         """Generate a signature for content-based deduplication (Retailer + Title + Price)"""
         try:
-            raw = msg.get("raw_data", {})
-            embed = raw.get("embed") or {}
+            raw = msg.get("raw_data") or _EMPTY_DICT
+            embed = raw.get("embed") or _EMPTY_DICT
             content = msg.get("content", "")
             
             retailer = ""
@@ -1304,10 +1975,9 @@ class MessagePoller:
             title = embed.get("title", "")
             
             # Extract price from embed fields
-            for field in embed.get("fields", []):
-                name = (field.get("name") or "").lower()
-                if "price" in name:
-                    price = field.get("value", "")
+            for _, name_lower, value in _field_view(msg):
+                if "price" in name_lower:
+                    price = value
                     break
             
             # 2. FALLBACK: Parse plain text content if embed data missing
@@ -1320,7 +1990,7 @@ class MessagePoller:
                         if not retailer and len(parts) > 2:
                             retailer = parts[2]
                         if not price:
-                            price_match = re.search(r'[£$€]\s*[\d,]+\.?\d*', content)
+                            price_match = _SIG_PRICE_RE.search(content)
                             if price_match:
                                 price = price_match.group(0)
             
@@ -1333,9 +2003,9 @@ class MessagePoller:
             
             # If everything is still empty, use content hash or ID
             if raw_sig == "||":
-                return hashlib.md5(content.encode()).hexdigest() if content else str(msg.get("id"))
+                return _signature_hash(content) if content else str(msg.get("id"))
                 
-            return hashlib.md5(raw_sig.encode()).hexdigest()
+            return _signature_hash(raw_sig)
             
         except Exception as e:
             logger.error(f"Error generating signature: {e}")
@@ -1360,79 +2030,78 @@ class MessagePoller:
             params = {
                 "scraped_at": f"gt.{self.last_scraped_at}", 
                 "order": "scraped_at.asc",
-                "limit": 100  # Fetch in batches
+                "limit": POLL_BATCH_SIZE  # Fetch in bounded batches - the rest arrive next poll
             }
             
-            res = requests.get(url, headers=headers, params=params, timeout=45)
+            res = http_session.get(url, headers=headers, params=params, timeout=45)
             
             if res.status_code != 200:
                 logger.error(f"Poll failed: {res.status_code}")
                 return []
             
-            messages = res.json()
+            # Parse straight from bytes - skips requests' text decode and charset sniffing
+            messages = orjson.loads(res.content)
             
             if not messages:
                 # No new messages - don't save cursor unnecessarily
                 return []
             
-            now_iso = datetime.utcnow().isoformat()
-            now_dt = datetime.utcnow()
+            # Mutate dedup state under the lock so the CursorSync thread never snapshots it mid-update
+            with self.lock:
+                now_ts = time.time()
+                cutoff = now_ts - 600
             
-            # Prune time-based signatures older than 10 minutes
-            pruned_sigs = {}
-            for sig_hash, ts in self.time_based_signatures.items():
-                try:
-                    sig_time = parse_iso_datetime(ts)
-                    if (now_dt - sig_time) < timedelta(minutes=10):
-                        pruned_sigs[sig_hash] = ts
-                except:
-                    pass
-            self.time_based_signatures = pruned_sigs
-
-            new_messages = []
-            latest_scraped_at = self.last_scraped_at
+                # Prune time-based signatures older than 10 minutes
+                self.time_based_signatures = {
+                    sig_hash: ts for sig_hash, ts in self.time_based_signatures.items() if ts > cutoff
+                }
+
+                dedup_index = self._build_dedup_index()
+                new_messages = []
+                latest_scraped_at = self.last_scraped_at
             
-            for msg in messages:
-                msg_id = msg.get("id")
-                msg_scraped_at = msg.get("scraped_at")
+                for msg in messages:
+                    msg_id = msg.get("id")
+                    msg_scraped_at = msg.get("scraped_at")
                 
-                # Track latest timestamp
-                if msg_scraped_at and msg_scraped_at > latest_scraped_at:
-                    latest_scraped_at = msg_scraped_at
+                    # Track latest timestamp
+                    if msg_scraped_at and msg_scraped_at > latest_scraped_at:
+                        latest_scraped_at = msg_scraped_at
                 
-                # LAYER 1: Discord ID Check (All-time tracking)
-                if not msg_id or str(msg_id) in self.sent_ids:
-                    continue
+                    # LAYER 1: Discord ID Check (All-time tracking)
+                    if not msg_id or str(msg_id) in self.sent_ids:
+                        continue
                 
-                sig = self._get_content_signature(msg)
+                    sig = self._get_content_signature(msg)
                 
-                # LAYER 2: Content Signature (Sliding Window - last 20)
-                if sig in self.recent_signatures:
-                    logger.info(f"⏭️ LAYER 2 BLOCK: Duplicate content window: {msg_id} (Sig: {sig[:8]})")
-                    self.sent_ids.add(str(msg_id))
-                    continue
-                
-                # LAYER 3: Time-Based Deduplication (10-minute window)
-                if sig in self.time_based_signatures:
-                    logger.info(f"⏭️ LAYER 3 BLOCK: Duplicate content within 10m: {msg_id} (Sig: {sig[:8]})")
-                    self.sent_ids.add(str(msg_id))
-                    continue
+                    # LAYER 2: Content Signature (Sliding Window - last 20)
+                    # LAYER 3: Time-Based Deduplication (10-minute window)
+                    layer = dedup_index.get(sig)
+                    if layer is not None:
+                        if layer == 2:
+                            logger.info(f"⏭️ LAYER 2 BLOCK: Duplicate content window: {msg_id} (Sig: {sig[:8]})")
+                        else:
+                            logger.info(f"⏭️ LAYER 3 BLOCK: Duplicate content within 10m: {msg_id} (Sig: {sig[:8]})")
+                        self._mark_sent(str(msg_id))
+                        continue
 
-                # MESSAGE ACCEPTED - Add to tracking IMMEDIATELY
-                new_messages.append(msg)
-                self.sent_ids.add(str(msg_id))
-                self.recent_signatures.append(sig)
-                self.recent_signatures = self.recent_signatures[-20:]  # Keep last 20
-                self.time_based_signatures[sig] = now_iso
+                    # MESSAGE ACCEPTED - Add to tracking IMMEDIATELY
+                    new_messages.append(msg)
+                    self._mark_sent(str(msg_id))
+                    evicted = self._remember_signature(sig)
+                    self.time_based_signatures[sig] = now_ts
+                    if evicted is not None and evicted not in self.time_based_signatures:
+                        dedup_index.pop(evicted, None)
+                    dedup_index[sig] = 2
             
-            # Update cursor timestamp to latest message
-            if latest_scraped_at > self.last_scraped_at:
-                self.last_scraped_at = latest_scraped_at
+                # Update cursor timestamp to latest message
+                if latest_scraped_at > self.last_scraped_at:
+                    self.last_scraped_at = latest_scraped_at
             
             # OPTIMIZATION: Only save cursor if we actually found new messages
             if new_messages:
                 self._save_cursor()
-                logger.info(f"📨 Found {len(new_messages)} new messages, cursor saved")
+                logger.info(f"📨 Found {len(new_messages)} new messages, cursor save queued")
             else:
                 logger.debug(f"No new unique messages (checked {len(messages)} total)")
                 
@@ -1447,8 +2116,9 @@ class MessagePoller:
         Manually update cursor to given scraped_at timestamp
         Used for error recovery or manual cursor adjustment
         """
-        old_cursor = self.last_scraped_at
-        self.last_scraped_at = scraped_at
+        with self.lock:
+            old_cursor = self.last_scraped_at
+            self.last_scraped_at = scraped_at
         self._save_cursor(force=True)
         logger.info(f"🔄 Cursor manually updated: {old_cursor} -> {scraped_at}")
 
@@ -1562,8 +2232,7 @@ poller = MessagePoller()
 
 def is_superadmin(user_id: str) -> bool:
     """Check if user is one of the main admins from .env"""
-    uid_str = str(user_id)
-    return uid_str in ADMIN_USER_IDS
+    return str(user_id) in _ADMIN_USER_ID_SET
 
 def is_admin(user_id: str) -> bool:
     """Check if user is either a superadmin or secondary admin"""
@@ -1573,11 +2242,13 @@ def is_admin(user_id: str) -> bool:
 async def notify_admins(context: ContextTypes.DEFAULT_TYPE, text: str):
     """Notify all admins of an event/error"""
     admin_ids = sm.get_all_admins()
-    for aid in admin_ids:
-        try:
-            await context.bot.send_message(chat_id=aid, text=text, parse_mode=ParseMode.HTML)
-        except Exception as e:
-            logger.error(f"Failed to notify admin {aid}: {e}")
+    results = await asyncio.gather(
+        *(context.bot.send_message(chat_id=aid, text=text, parse_mode=ParseMode.HTML) for aid in admin_ids),
+        return_exceptions=True
+    )
+    for aid, result in zip(admin_ids, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to notify admin {aid}: {result}")
 
 
 # --- PROFESSIONAL MESSAGE FORMATTING ---
@@ -1604,6 +2275,16 @@ REGEX_PATTERNS_TO_REMOVE = [
     r'Experimental\s+software\.\s+AI\s+can\s+be\s+inaccurate,\s+DYOR!',
 ]
 
+# Compiled once: all literal phrases fused into one alternation (longest first so
+# "CCN 2.0 | Profitable Pinger" wins over the bare "CCN" at the same position)
+_MARKDOWN_LINK_RE = re.compile(r'\[([^\]]+)\]\((https?://[^\)]+)\)')
+_PHRASES_RE = re.compile(
+    '|'.join(re.escape(p) for p in sorted(set(PHRASES_TO_REMOVE), key=len, reverse=True)),
+    re.IGNORECASE
+)
+_DYNAMIC_PATTERNS_RE = [re.compile(p, re.IGNORECASE) for p in REGEX_PATTERNS_TO_REMOVE]
+_WHITESPACE_RE = re.compile(r'\s+')
+
 def clean_text(text: str) -> str:
     """Remove unwanted phrases from text and clean up markdown links"""
     if not text:
@@ -1611,20 +2292,48 @@ def clean_text(text: str) -> str:
     
     # NEW: Strip markdown links [Text](URL) -> Text
     # We do this FIRST so PHRASES_TO_REMOVE can target the cleaned text
-    text = re.sub(r'\[([^\]]+)\]\((https?://[^\)]+)\)', r'\1', text)
+    text = _MARKDOWN_LINK_RE.sub(r'\1', text)
     
     # Remove literal phrases
-    for phrase in PHRASES_TO_REMOVE:
-        text = re.sub(re.escape(phrase), "", text, flags=re.IGNORECASE)
+    text = _PHRASES_RE.sub("", text)
     
     # Remove patterns with regex
-    for pattern in REGEX_PATTERNS_TO_REMOVE:
-        text = re.sub(pattern, "", text, flags=re.IGNORECASE)
+    for pattern in _DYNAMIC_PATTERNS_RE:
+        text = pattern.sub("", text)
     
     # Clean up extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WHITESPACE_RE.sub(' ', text).strip()
     return text
 
+_DISCOUNT_PRICE_RE = re.compile(r'([£$€]?\d+(?:[.,]\d{1,2})?)[\s]*\((-?\d+%?)\)[\s]*([£$€]?\d+(?:[.,]\d{1,2})?)')
+_STRIKETHROUGH_RE = re.compile(r'~~([^~]+)~~')
+_PRICE_TOKEN_RE = re.compile(r'[£$€]?\d+(?:[.,]\d{1,2})?')
+_SIMPLE_PRICE_RE = re.compile(r'^[£$€]?\d+(?:[.,]\d{1,2})?$')
+# Complete prices only - not preceded by decimal point, currency, or digit and
+# not followed by % or digit. Commas allowed as thousands separators: (?:,\d{3})*
+_STANDALONE_PRICE_RE = re.compile(r'(?<![£$€\d.])\d+(?:,\d{3})*(?:\.\d{1,2})?(?![%\d])')
+
+def _ensure_currency(price_str: str) -> str:
+    """Prefix £ unless the price already carries a currency symbol"""
+    price_str = price_str.strip()
+    if price_str and not any(c in price_str for c in ['£', '$', '€']):
+        return f"£{price_str}"
+    return price_str
+
+def _add_currency_replacer(m: re.Match) -> str:
+    price = m.group(0)
+    # Check what comes after this match in the original text
+    end_pos = m.end()
+    suffix = m.string[end_pos:end_pos+10].strip().upper()
+    
+    # Don't add £ if followed by currency code (it already has a denomination)
+    if suffix.startswith(('USD', 'EUR', 'GBP', 'CAD', 'AUD')):
+        return price  # Leave as-is, it has a currency label
+    
+    if not any(c in price for c in ['£', '$', '€']):
+        return f"£{price}"
+    return price
+
 def format_price_value(value: str) -> str:
     """
     Format price value for Telegram with smart discount detection.
@@ -1641,25 +2350,16 @@ def format_price_value(value: str) -> str:
     # Strip leading/trailing whitespace
     value = value.strip()
     
-    # Helper to ensure currency symbol
-    def ensure_currency(price_str):
-        price_str = price_str.strip()
-        if price_str and not any(c in price_str for c in ['£', '$', '€']):
-            return f"£{price_str}"
-        return price_str
-    
     # Pattern 1: Detect discount format "ORIGINAL_PRICE (PERCENT%) DISCOUNTED_PRICE"
     # Matches: "2.95 (-32%) 1.99", "£2.95 (-32%) £1.99", "0.95 (-47%) 0.5"
-    discount_pattern = r'([£$€]?\d+(?:[.,]\d{1,2})?)[\s]*\((-?\d+%?)\)[\s]*([£$€]?\d+(?:[.,]\d{1,2})?)'
-    
-    match = re.search(discount_pattern, value)
+    match = _DISCOUNT_PRICE_RE.search(value)
     if match:
-        original_price = ensure_currency(match.group(1))
+        original_price = _ensure_currency(match.group(1))
         discount_percent = match.group(2)
         # Ensure percent has % if it doesn't
         if '%' not in discount_percent:
             discount_percent = f"{discount_percent}%"
-        discounted_price = ensure_currency(match.group(3))
+        discounted_price = _ensure_currency(match.group(3))
         
         # Format: strikethrough original, bold discounted
         return f"<s>{original_price}</s> ({discount_percent}) <b>{discounted_price}</b>"
@@ -1667,45 +2367,25 @@ def format_price_value(value: str) -> str:
     # Pattern 2: Discord markdown strikethrough ~~text~~
     if '~~' in value:
         # Convert ~~text~~ to <s>text</s>
-        value = re.sub(r'~~([^~]+)~~', r'<s>\1</s>', value)
+        value = _STRIKETHROUGH_RE.sub(r'<s>\1</s>', value)
         
         # Find any remaining prices and ensure they have currency + bold the last one
-        prices = re.findall(r'[£$€]?\d+(?:[.,]\d{1,2})?', value)
+        prices = _PRICE_TOKEN_RE.findall(value)
         if prices:
             last_price = prices[-1]
             # Bold the discounted price (last price not in strikethrough)
             if f"<s>{last_price}</s>" not in value and f"<s>£{last_price}</s>" not in value:
-                value = value.replace(last_price, f"<b>{ensure_currency(last_price)}</b>", 1)
+                value = value.replace(last_price, f"<b>{_ensure_currency(last_price)}</b>", 1)
     
     # Pattern 3: Simple price without discount - just ensure currency symbol
     # Only add currency if it's a simple standalone price
-    simple_price_pattern = r'^[£$€]?\d+(?:[.,]\d{1,2})?$'
-    if re.match(simple_price_pattern, value.strip()):
-        return ensure_currency(value.strip())
+    if _SIMPLE_PRICE_RE.match(value.strip()):
+        return _ensure_currency(value.strip())
     
     # Fallback: ensure all standalone numeric prices have currency symbols
     # But don't match numbers that are part of a decimal (like "99" in "2.99")
     # And don't add £ to numbers that are followed by currency codes like USD, EUR
-    def add_currency_to_prices(text):
-        def replacer(m):
-            price = m.group(0)
-            # Check what comes after this match in the original text
-            end_pos = m.end()
-            suffix = text[end_pos:end_pos+10].strip().upper()
-            
-            # Don't add £ if followed by currency code (it already has a denomination)
-            if suffix.startswith(('USD', 'EUR', 'GBP', 'CAD', 'AUD')):
-                return price  # Leave as-is, it has a currency label
-            
-            if not any(c in price for c in ['£', '$', '€']):
-                return f"£{price}"
-            return price
-        # Match complete prices only - must not be preceded by decimal point, currency, or digit
-        # and must not be followed by % or digit (unless it's the decimal portion)
-        # Added support for commas as thousands separators: (?:,\d{3})*
-        return re.sub(r'(?<![£$€\d.])\d+(?:,\d{3})*(?:\.\d{1,2})?(?![%\d])', replacer, text)
-    
-    return add_currency_to_prices(value)
+    return _STANDALONE_PRICE_RE.sub(_add_currency_replacer, value)
 
 
 # --- CHANNEL SPECIFIC FORMATTERS ---
@@ -1714,6 +2394,47 @@ CHANNEL_COLLECTORS = "1367813504786108526"
 CHANNEL_ARGOS = "855164313006505994"
 CHANNEL_RESTOCKS = "864504557903937587"
 
+# Field names containing these are buttons/links, not display fields
+_SKIP_FIELD_KEYWORDS = ('link', 'atc', 'qt', 'checkout')
+_SKIP_FIELD_KEYWORDS_OFFER = _SKIP_FIELD_KEYWORDS + ('offer id',)
+
+# (keyword, icon) pairs per formatter - first keyword found in the lowercased field name wins
+_COLLECTORS_ICON_MAP = (
+    ("price", "💰"), ("stock", "✅"), ("type", "🔖"), ("size", "📏"),
+    ("quantity", "🔢"), ("qty", "🔢"),
+)
+_ARGOS_ICON_MAP = (
+    ("store", "📍"), ("availability", "📍"), ("price", "💰"), ("stock", "✅"), ("size", "📏"),
+)
+_RESTOCKS_ICON_MAP = (
+    ("price", "💰"), ("resell", "📈"), ("profit", "📈"), ("type", "🔖"), ("stock", "✅"),
+    ("product info", "ℹ️"),
+)
+_GENERIC_ICON_MAP = (
+    ("status", "✅"), ("stock", "✅"), ("price", "💰"), ("cost", "💰"), ("type", "🔖"),
+    ("resell", "📈"), ("profit", "📈"), ("member", "👥"), ("store", "🏪"), ("shop", "🏪"),
+    ("size", "📏"), ("product", "📦"), ("region", "🌍"), ("location", "🌍"),
+    ("quantity", "🔢"), ("qty", "🔢"),
+)
+
+def _field_icon(name_lower: str, icon_map: Tuple[Tuple[str, str], ...]) -> str:
+    return next((icon for kw, icon in icon_map if kw in name_lower), "•")
+
+def _iter_display_fields(fields: List[Dict], skip_keywords: Tuple[str, ...]):
+    """Yield (name, name_lower, value) for displayable embed fields.
+    Skipped names are rejected before their value is cleaned; N/A and repeated values are dropped."""
+    seen_values = set()
+    for f in fields:
+        name = clean_text(f.get("name", ""))
+        if not name: continue
+        name_lower = name.lower()
+        if any(kw in name_lower for kw in skip_keywords): continue
+        val = clean_text(f.get("value", ""))
+        if not val or "n/a" in val.lower(): continue
+        if val in seen_values: continue
+        seen_values.add(val)
+        yield name, name_lower, val
+
 def _format_collectors_amazon(msg_data: Dict, embed: Dict) -> Tuple[List[str], List[List[InlineKeyboardButton]]]:
     """Formatter for Collectors Edge / Amazon V3 (Channel 136...)"""
     lines = []
@@ -1734,29 +2455,10 @@ def _format_collectors_amazon(msg_data: Dict, embed: Dict) -> Tuple[List[str], L
         lines.append("━━━━━━━━━━━━━━━")
         lines.append("")
     
-    # 2. ALL Fields (comprehensive)
-    fields = embed.get("fields", [])
-    seen_values = set()
-    
-    for f in fields:
-        name = clean_text(f.get("name", ""))
-        val = clean_text(f.get("value", ""))
-        
-        # Skip link/button fields and N/A values
-        if not name or not val: continue
-        if any(kw in name.lower() for kw in ['link', 'atc', 'qt', 'checkout']): continue
-        if "n/a" in val.lower(): continue
-        if val in seen_values: continue
-        seen_values.add(val)
-        
+    # 2. ALL Fields (comprehensive) - link/button fields and N/A values skipped
+    for name, name_lower, val in _iter_display_fields(embed.get("fields") or _EMPTY_TUPLE, _SKIP_FIELD_KEYWORDS):
         # Smart icon selection
-        name_lower = name.lower()
-        if "price" in name_lower: icon = "💰"
-        elif "stock" in name_lower or "in stock" in name_lower: icon = "✅"
-        elif "type" in name_lower: icon = "🔖"
-        elif "size" in name_lower: icon = "📏"
-        elif "quantity" in name_lower or "qty" in name_lower: icon = "🔢"
-        else: icon = "•"
+        icon = _field_icon(name_lower, _COLLECTORS_ICON_MAP)
         
         # Add currency symbol and bold prices
         if "price" in name_lower:
@@ -1783,28 +2485,11 @@ def _format_argos(msg_data: Dict, embed: Dict) -> Tuple[List[str], List[List[Inl
         lines.append("")
     
     # Display ALL fields
-    fields = embed.get("fields", [])
-    seen_values = set()
-    
-    for f in fields:
-        name = clean_text(f.get("name", ""))
-        val = clean_text(f.get("value", ""))
-        
-        if not name or not val: continue
-        if any(kw in name.lower() for kw in ['link', 'atc', 'qt', 'checkout', 'offer id']): continue
-        if "n/a" in val.lower(): continue
-        if val in seen_values: continue
-        seen_values.add(val)
-        
-        name_lower = name.lower()
-        if "store" in name_lower or "availability" in name_lower: icon = "📍"
-        elif "price" in name_lower: icon = "💰"
-        elif "stock" in name_lower: icon = "✅"
-        elif "size" in name_lower: icon = "📏"
-        else: icon = "•"
+    for name, name_lower, val in _iter_display_fields(embed.get("fields") or _EMPTY_TUPLE, _SKIP_FIELD_KEYWORDS_OFFER):
+        icon = _field_icon(name_lower, _ARGOS_ICON_MAP)
         
         # Add currency to prices
-        if "price" in name_lower and val:
+        if "price" in name_lower:
             val = format_price_value(val)
         
         lines.append(f"{icon} <b>{name}:</b> {val}")
@@ -1816,13 +2501,15 @@ def _format_restocks_currys(msg_data: Dict, embed: Dict) -> Tuple[List[str], Lis
     lines = []
     
     # This channel puts "Product Info" with "Just Restocked At..."
-    fields = embed.get("fields", [])
+    fields = embed.get("fields") or _EMPTY_TUPLE
     prod_info = ""
     resell = ""
     price = ""
     
     for f in fields:
         name = clean_text(f.get("name", "")).lower()
+        # Only clean values this pass actually reads
+        if "product info" not in name and "resell" not in name and "price" not in name: continue
         val = clean_text(f.get("value", ""))
         if "product info" in name: prod_info = val
         if "resell" in name and "n/a" not in val.lower(): resell = val
@@ -1846,24 +2533,8 @@ def _format_restocks_currys(msg_data: Dict, embed: Dict) -> Tuple[List[str], Lis
         lines.append("")
     
     # Display ALL fields with smart prioritization
-    seen_values = set()
-    for f in fields:
-        name = clean_text(f.get("name", ""))
-        val = clean_text(f.get("value", ""))
-        
-        if not name or not val: continue
-        if any(kw in name.lower() for kw in ['link', 'atc', 'qt', 'checkout', 'offer id']): continue  
-        if "n/a" in val.lower(): continue
-        if val in seen_values: continue
-        seen_values.add(val)
-        
-        name_lower = name.lower()
-        if "price" in name_lower: icon = "💰"
-        elif "resell" in name_lower or "profit" in name_lower: icon = "📈"
-        elif "type" in name_lower: icon = "🔖"
-        elif "stock" in name_lower: icon = "✅"
-        elif "product info" in name_lower: icon = "ℹ️"
-        else: icon = "•"
+    for name, name_lower, val in _iter_display_fields(fields, _SKIP_FIELD_KEYWORDS_OFFER):
+        icon = _field_icon(name_lower, _RESTOCKS_ICON_MAP)
         
         if "price" in name_lower:
             val = format_price_value(val)
@@ -1875,18 +2546,27 @@ def _format_restocks_currys(msg_data: Dict, embed: Dict) -> Tuple[List[str], Lis
     
     return lines, []
 
+# channel_id -> formatter; anything else uses the generic formatter
+_CHANNEL_FORMATTERS = {
+    CHANNEL_COLLECTORS: _format_collectors_amazon,
+    CHANNEL_ARGOS: _format_argos,
+    CHANNEL_RESTOCKS: _format_restocks_currys,
+}
+
 # Utility functions consolidated at the top of the file
 
 
-def format_telegram_message(msg_data: Dict) -> Tuple[str, Optional[str], Optional[InlineKeyboardMarkup], bool]:
+async def format_telegram_message(msg_data: Dict) -> Tuple[str, Optional[str], Optional[InlineKeyboardMarkup], bool]:
     """
     Dispatcher for channel-specific formatting with Fallback to Generic.
     """
-    raw = msg_data.get("raw_data", {})
+    raw = msg_data.get("raw_data") or _EMPTY_DICT
     embed = raw.get("embed")
     # author = raw.get("author", {}) # Unused
     plain_content = msg_data.get("content", "")
-    channel_id = str(msg_data.get("channel_id", ""))
+    channel_id = msg_data.get("channel_id", "")
+    if not isinstance(channel_id, str):
+        channel_id = str(channel_id)
     
     # Parse tag info just in case
     tag_info = parse_tag_line(plain_content) if plain_content else {}
@@ -1896,16 +2576,9 @@ def format_telegram_message(msg_data: Dict) -> Tuple[str, Optional[str], Optiona
     
     # === DISPATCHER ===
     if embed:
-        if channel_id == CHANNEL_COLLECTORS:
-            l, b = _format_collectors_amazon(msg_data, embed)
-            lines.extend(l)
-            custom_buttons.extend(b)
-        elif channel_id == CHANNEL_ARGOS:
-            l, b = _format_argos(msg_data, embed)
-            lines.extend(l)
-            custom_buttons.extend(b)
-        elif channel_id == CHANNEL_RESTOCKS:
-            l, b = _format_restocks_currys(msg_data, embed)
+        formatter = _CHANNEL_FORMATTERS.get(channel_id)
+        if formatter:
+            l, b = formatter(msg_data, embed)
             lines.extend(l)
             custom_buttons.extend(b)
         else:
@@ -1946,49 +2619,15 @@ def format_telegram_message(msg_data: Dict) -> Tuple[str, Optional[str], Optiona
                     lines.append("")
             
             # FIELDS
-            seen_values = set()
-            if embed.get("fields"):
-                for field in embed["fields"]:
-                    name = clean_text(field.get("name", ""))
-                    value = clean_text(field.get("value", ""))
-                    
-                    if name and value and not any(kw in name.lower() for kw in ['link', 'atc', 'qt', 'checkout', 'offer id']):
-                        # Skip N/A values
-                        if "n/a" in value.lower(): continue
-
-                        if value in seen_values: continue
-                        seen_values.add(value)
-                        
-                        # Enhanced emoji mapping for comprehensive field coverage
-                        name_lower = name.lower()
-                        if "status" in name_lower or "stock" in name_lower or "in stock" in name_lower: 
-                            icon = "✅"
-                        elif "price" in name_lower or "cost" in name_lower: 
-                            icon = "💰"
-                        elif "type" in name_lower:
-                            icon = "🔖"
-                        elif "resell" in name_lower or "profit" in name_lower: 
-                            icon = "📈"
-                        elif "member" in name_lower: 
-                            icon = "👥"
-                        elif "store" in name_lower or "shop" in name_lower: 
-                            icon = "🏪"
-                        elif "size" in name_lower: 
-                            icon = "📏"
-                        elif "product" in name_lower: 
-                            icon = "📦"
-                        elif "region" in name_lower or "location" in name_lower:
-                            icon = "🌍"
-                        elif "quantity" in name_lower or "qty" in name_lower:
-                            icon = "🔢"
-                        else: 
-                            icon = "•"
-                        
-                        if "price" in name_lower:
-                            value = format_price_value(value)
-                            lines.append(f"{icon} <b>{name}:</b> <b>{value}</b>")
-                        else:
-                            lines.append(f"{icon} <b>{name}:</b> {value}")
+            for name, name_lower, value in _iter_display_fields(embed.get("fields") or _EMPTY_TUPLE, _SKIP_FIELD_KEYWORDS_OFFER):
+                # Enhanced emoji mapping for comprehensive field coverage
+                icon = _field_icon(name_lower, _GENERIC_ICON_MAP)
+                
+                if "price" in name_lower:
+                    value = format_price_value(value)
+                    lines.append(f"{icon} <b>{name}:</b> <b>{value}</b>")
+                else:
+                    lines.append(f"{icon} <b>{name}:</b> {value}")
             lines.append("")
         
         # FOOTER (Common)
@@ -2041,44 +2680,23 @@ def format_telegram_message(msg_data: Dict) -> Tuple[str, Optional[str], Optiona
     buy_links = []
     other_links = []
     
+    link_buckets = {'ebay': ebay_links, 'fba': fba_links, 'buy': buy_links, 'other': other_links}
+    
     for link in all_links:
-        text_lower = link.get('text', '').lower()
         url = link.get('url', '')
-        link_text = clean_text(link.get('text', 'Link'))
-        field = link.get('field', '').lower()
-        link_type = link.get('type', '').lower() # Check for 'title' type
-        
         if not url or not url.startswith('http'): continue
         if url in seen_urls: continue
         
-        # Helper to categorize
-        def add_category(cat_list):
-            cat_list.append({'text': link_text, 'url': url, 'field': field})
-            seen_urls.add(url)
-            
-        if link_type == 'title':
-            add_category(title_links)
-        elif 'atc' in field or 'qt' in field:
-            add_category(atc_links)
-
-        elif 'link' in field:
-            if any(kw in text_lower for kw in ['sold', 'active', 'google', 'ebay']):
-                add_category(ebay_links)
-            elif any(kw in text_lower for kw in ['keepa', 'amazon', 'selleramp', 'camel']):
-                add_category(fba_links)
-            elif any(kw in text_lower for kw in ['buy', 'shop', 'purchase', 'checkout', 'cart']):
-                add_category(buy_links)
-            else:
-                add_category(other_links)
+        field = link.get('field', '').lower()
+        if link.get('type', '').lower() == 'title':
+            cat_list = title_links
+        elif _ATC_FIELD_RE.search(field):
+            cat_list = atc_links
         else:
-            if any(kw in text_lower for kw in ['sold', 'active', 'google', 'ebay']):
-                add_category(ebay_links)
-            elif any(kw in text_lower for kw in ['keepa', 'amazon', 'selleramp', 'camel']):
-                add_category(fba_links)
-            elif any(kw in text_lower for kw in ['buy', 'shop', 'purchase', 'checkout', 'cart']):
-                add_category(buy_links)
-            else:
-                add_category(other_links)
+            cat_list = link_buckets[_link_text_bucket(link.get('text', '').lower())]
+        
+        cat_list.append({'text': clean_text(link.get('text', 'Link')), 'url': url, 'field': field})
+        seen_urls.add(url)
 
     # === IMAGE STRATEGY ===
     # Strategy: "Trusted Resolution" vs "Scrape"
@@ -2098,17 +2716,39 @@ def format_telegram_message(msg_data: Dict) -> Tuple[str, Optional[str], Optiona
         elif embed.get("thumbnail"):
             discord_candidate = optimize_image_url(embed["thumbnail"])
             
-    # 2. Empirical Check: Download and Verify Pixels
-    if discord_candidate:
-        logger.info(f"   🔍 Verifying Discord candidate image: {discord_candidate[:60]}...")
-        # Note: download_image_high_quality uses Pillow internally to verify
-        downloaded = download_image_high_quality(discord_candidate)
+    # Website to scrape if the Discord image turns out low-res
+    target_scrape_url = None
+    if title_links: target_scrape_url = title_links[0]['url']
+    elif buy_links: target_scrape_url = buy_links[0]['url']
+    elif atc_links: target_scrape_url = atc_links[0]['url']
+    elif other_links: target_scrape_url = other_links[0]['url']
+    if target_scrape_url and _SKIP_SCRAPE_RE.search(target_scrape_url):
+        target_scrape_url = None
+    
+    async def _scrape_and_verify() -> Optional[Tuple[str, bytes]]:
+        logger.info(f"   🔍 Attempting to scrape images from: {target_scrape_url[:60]}...")
+        scraped_images = await fetch_product_images(target_scrape_url, max_images=1)
+        if scraped_images:
+            scraped_url = scraped_images[0]
+            # Verify scraped image quality as well
+            logger.info(f"   🔍 Verifying scraped image: {scraped_url[:60]}...")
+            downloaded_scraped = await download_image_high_quality(scraped_url)
+            if downloaded_scraped:
+                return scraped_url, downloaded_scraped
+        return None
+    
+    # Start the scrape speculatively so it overlaps the Discord check; cancelled if Discord wins
+    scrape_task = asyncio.create_task(_scrape_and_verify()) if target_scrape_url else None
+    
+    try:
+        # 2. Empirical Check: Download and Verify Pixels
+        if discord_candidate:
+            logger.info(f"   🔍 Verifying Discord candidate image: {discord_candidate[:60]}...")
+            # Pillow already verified the image (and read its size) during download
+            result = await download_image_with_size(discord_candidate, min_side=200)
         
-        if downloaded:
-            try:
-                img = Image.open(BytesIO(downloaded))
-                width, height = img.size
-                
+            if result:
+                downloaded, (width, height) = result
                 # Trust it if it's high res (>= 400px in either dimension)
                 # This covers long thin images or wide banners correctly
                 if width >= 200 or height >= 200:
@@ -2117,31 +2757,21 @@ def format_telegram_message(msg_data: Dict) -> Tuple[str, Optional[str], Optiona
                     logger.info(f"   📸 ✅ Discord image is High-Res pixels ({width}x{height}). Skipping scrape.")
                 else:
                     logger.info(f"   ⚠️ Discord image is Low-Res pixels ({width}x{height}).")
-            except Exception as e:
-                logger.warning(f"   ⚠️ Failed to verify Discord image pixels: {e}")
 
-    # 3. Attempt Scraping ONLY if we don't have a high-res candidate yet
-    if not image_url:
-        target_scrape_url = None
-        if title_links: target_scrape_url = title_links[0]['url']
-        elif buy_links: target_scrape_url = buy_links[0]['url']
-        elif atc_links: target_scrape_url = atc_links[0]['url']
-        elif other_links: target_scrape_url = other_links[0]['url']
-        
-        if target_scrape_url:
-            skip_scrape = any(x in target_scrape_url.lower() for x in ['keepa.com', 'ebay.com/sch', 'login', 'cart', 'checkout'])
-            if not skip_scrape:
-                logger.info(f"   🔍 Attempting to scrape images from: {target_scrape_url[:60]}...")
-                scraped_images = fetch_product_images(target_scrape_url, max_images=1)
-                if scraped_images:
-                    scraped_url = scraped_images[0]
-                    # Verify scraped image quality as well
-                    logger.info(f"   🔍 Verifying scraped image: {scraped_url[:60]}...")
-                    downloaded_scraped = download_image_high_quality(scraped_url)
-                    if downloaded_scraped:
-                        image_url = scraped_url
-                        image_bytes = downloaded_scraped
-                        logger.info(f"   📸 ✅ Using verified scraped website image.")
+        # 3. Use the scraped image ONLY if we don't have a high-res candidate yet
+        if scrape_task and not image_url:
+            scraped = await scrape_task
+            if scraped:
+                image_url, image_bytes = scraped
+                logger.info(f"   📸 ✅ Using verified scraped website image.")
+    finally:
+        # Cancel the scrape if Discord won, and never leave it orphaned - also when this coroutine is cancelled
+        if scrape_task:
+            scrape_task.cancel()
+            try:
+                await scrape_task
+            except (asyncio.CancelledError, Exception):
+                pass
 
     # 4. Final Fallback (If scraping failed or returned low res, use the best we found)
     if not image_url and discord_candidate:
@@ -2157,7 +2787,7 @@ def format_telegram_message(msg_data: Dict) -> Tuple[str, Optional[str], Optiona
     if ebay_links:
         row = []
         for link in ebay_links[:3]:
-            emoji = '💰' if 'sold' in link['text'].lower() else '⚡'
+            emoji = '💰' if _SOLD_TEXT_RE.search(link['text']) else '⚡'
             btn_text = f"{emoji} {link['text'][:15]}"
             row.append(InlineKeyboardButton(btn_text, url=link['url']))
         if row:
@@ -2167,7 +2797,7 @@ def format_telegram_message(msg_data: Dict) -> Tuple[str, Optional[str], Optiona
     if fba_links:
         row = []
         for link in fba_links[:3]:
-            emoji = '📈' if 'keepa' in link['text'].lower() else '🔎'
+            emoji = '📈' if _KEEPA_TEXT_RE.search(link['text']) else '🔎'
             btn_text = f"{emoji} {link['text'][:15]}"
             row.append(InlineKeyboardButton(btn_text, url=link['url']))
         if row:
@@ -2186,7 +2816,7 @@ def format_telegram_message(msg_data: Dict) -> Tuple[str, Optional[str], Optiona
     if atc_links:
         row = []
         for link in atc_links[:5]:
-            qty_match = re.search(r'\d+', link['text'])
+            qty_match = _QTY_RE.search(link['text'])
             qty = qty_match.group(0) if qty_match else link['text']
             btn_text = f"🛒 {qty}"
             row.append(InlineKeyboardButton(btn_text, url=link['url']))
@@ -2213,47 +2843,41 @@ def format_telegram_message(msg_data: Dict) -> Tuple[str, Optional[str], Optiona
 
 
 
+_PROFITABLE_PINGER_RE = re.compile(r'profitable pinger', re.IGNORECASE)
+_JUST_RESTOCKED_RE = re.compile(r'just restocked for', re.IGNORECASE)
+
+def _any_search(pattern: re.Pattern, candidates) -> bool:
+    """True if pattern occurs in any non-empty candidate string (stops at the first hit)"""
+    return any(pattern.search(text) for text in candidates if text)
+
+def _iter_field_texts(msg_data: Dict):
+    for name, _, value in _field_view(msg_data):
+        yield name
+        yield value
+
+
 def is_duplicate_source(msg_data: Dict) -> bool:
     """
     Check if message is from a duplicate source (like Profitable Pinger).
     These are filtered out to avoid duplicate alerts.
     """
-    raw = msg_data.get("raw_data", {})
-    embed = raw.get("embed") or {}
-    plain_content = msg_data.get("content", "")
+    raw = msg_data.get("raw_data") or _EMPTY_DICT
+    embed = raw.get("embed") or _EMPTY_DICT
     
-    # Check author name
-    author_name = (raw.get("author", {}) or {}).get("name", "")
-    if author_name and "profitable pinger" in author_name.lower():
-        return True
-    
-    # Check embed author (only if embed exists)
+    # Author name, then embed author / footer (bot signature) / title / description
+    candidates = [(raw.get("author") or _EMPTY_DICT).get("name", "")]
     if embed:
-        embed_author = (embed.get("author") or {}).get("name", "")
-        if embed_author and "profitable pinger" in embed_author.lower():
-            return True
-        
-        # Check footer (bot signature)
-        footer = embed.get("footer", "")
-        if footer and "profitable pinger" in footer.lower():
-            return True
+        candidates += [
+            (embed.get("author") or _EMPTY_DICT).get("name", ""),
+            embed.get("footer", ""),
+            embed.get("title"),
+            embed.get("description"),
+        ]
+    if _any_search(_PROFITABLE_PINGER_RE, candidates):
+        return True
     
     # Check all fields in embed
-    if embed and embed.get("fields"):
-        for field in embed["fields"]:
-            val = (field.get("value") or "").lower()
-            name = (field.get("name") or "").lower()
-            if "profitable pinger" in val or "profitable pinger" in name:
-                return True
-                
-    # Check title and description
-    if embed:
-        title = (embed.get("title") or "").lower()
-        desc = (embed.get("description") or "").lower()
-        if "profitable pinger" in title or "profitable pinger" in desc:
-            return True
-
-    return False
+    return _any_search(_PROFITABLE_PINGER_RE, _iter_field_texts(msg_data))
 
 
 def is_restock_filter_match(msg_data: Dict) -> bool:
@@ -2261,38 +2885,48 @@ def is_restock_filter_match(msg_data: Dict) -> bool:
     Check if message contains "Just restocked for" phrase.
     These are filtered out based on user request.
     """
-    content = (msg_data.get("content") or "").lower()
-    if "just restocked for" in content:
-        return True
+    raw = msg_data.get("raw_data") or _EMPTY_DICT
+    embed = raw.get("embed") or _EMPTY_DICT
     
-    raw = msg_data.get("raw_data", {})
-    embed = raw.get("embed") or {}
-    
-    # Check title and description
-    title = (embed.get("title") or "").lower()
-    desc = (embed.get("description") or "").lower()
-    if "just restocked for" in title or "just restocked for" in desc:
+    # Content, title and description, then fields
+    candidates = (msg_data.get("content"), embed.get("title"), embed.get("description"))
+    if _any_search(_JUST_RESTOCKED_RE, candidates):
         return True
     
-    # Check fields
-    if embed.get("fields"):
-        for field in embed["fields"]:
-            val = (field.get("value") or "").lower()
-            name = (field.get("name") or "").lower()
-            if "just restocked for" in val or "just restocked for" in name:
-                return True
-                
-    return False
+    return _any_search(_JUST_RESTOCKED_RE, _iter_field_texts(msg_data))
 
 
-def create_main_menu(user_id: str = None) -> InlineKeyboardMarkup:
-    """Create main menu keyboard"""
+# Welcome screen intros ({username} is the only placeholder); the status block is appended per user
+_WELCOME_INTRO_START = """
+👋 <b>Welcome to Hollowscan!</b>
+
+<i>Hello {username}!</i> Get instant product alerts with all the data you need.
+
+🎯 <b>Features:</b>
+• Real-time deal notifications
+• Custom category preferences  
+• Premium tier for advanced features
+
+Use /settings to customize your alerts or /help for all commands.
+
+📊 <b>Status:</b>
+"""
+_WELCOME_INTRO_MENU = "👋 <b>Welcome to Hollowscan!</b>\n\n<i>Hello {username}!</i> Get instant product alerts with all the data you need.\n\n🎯 <b>Features:</b>\n• ⚡️ Real-time notifications\n• 🖼️ Product images\n• 🔗 Direct action links\n• 📊 Full stock & price data\n• ⏸️ Pause/Resume anytime\n\n📊 <b>Status:</b>\n"
+_WELCOME_TIP = '\n💡 <b>Tip:</b> Click on "⚙️ <b>Alert Settings</b>" below to toggle ✅ on or ❌ off any country store you want to receive (or stop receiving) notifications from. Customize your experience!'
+_WELCOME_INACTIVE = "❌ <b>Not subscribed</b>\n\nRedeem a code or subscribe below to get started!\n"
+
+
+def _build_welcome_html(intro: str, username: str, snapshot: Dict) -> str:
+    """Welcome text for /start and the main menu from a get_user_snapshot() result"""
+    head = intro.format(username=username)
+    if not snapshot["is_active"]:
+        return head + _WELCOME_INACTIVE
+    paused = "⏸️ Alerts currently paused\n" if snapshot["is_paused"] else ""
+    return f"{head}✅ <b>Active</b> – {snapshot['days_remaining']} days remaining\n{paused}{_WELCOME_TIP}"
+
+
+def _build_main_menu(is_active: bool, has_stripe: bool) -> InlineKeyboardMarkup:
     keyboard = []
-    uid = str(user_id) if user_id else None
-    user_data = sm.users.get(uid, {}) if uid else {}
-    is_active = sm.is_active(uid) if uid else False
-    has_stripe = bool(user_data.get("stripe_customer_id"))
-    
     if is_active:
         keyboard.append([InlineKeyboardButton("📊 My Status", callback_data="status")])
         keyboard.append([InlineKeyboardButton("⚙️ Alert Settings", callback_data="settings")])
@@ -2315,6 +2949,23 @@ def create_main_menu(user_id: str = None) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 
+# Every user sees one of three layouts; telegram objects are immutable, so they're built once and shared
+_MAIN_MENUS = {
+    (True, True): _build_main_menu(True, True),
+    (True, False): _build_main_menu(True, False),
+    (False, False): _build_main_menu(False, False),
+}
+
+
+def create_main_menu(user_id: str = None) -> InlineKeyboardMarkup:
+    """Create main menu keyboard"""
+    uid = str(user_id) if user_id else None
+    if not uid or not sm.is_active(uid):
+        return _MAIN_MENUS[(False, False)]
+    has_stripe = bool(sm.users.get(uid, _EMPTY_DICT).get("stripe_customer_id"))
+    return _MAIN_MENUS[(True, has_stripe)]
+
+
 def create_menu_with_back(buttons: List[List[InlineKeyboardButton]], back_to: str = "main") -> InlineKeyboardMarkup:
     """Create menu with back button"""
     keyboard = buttons + [
@@ -2356,7 +3007,8 @@ async def test_alerts(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "limit": count
         }
         
-        res = requests.get(url, headers=headers, params=params, timeout=10)
+        # Pooled session, off the event loop
+        res = await asyncio.to_thread(http_session.get, url, headers=headers, params=params, timeout=10)
         if res.status_code != 200:
             await update.message.reply_text(f"❌ API Error: {res.status_code}")
             return
@@ -2372,6 +3024,8 @@ async def test_alerts(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Let's do reverse to mimic "stream"
         messages.reverse() 
         
+        # Subscription filter first, then format + send concurrently (bounded - image scraping dominates)
+        wanted = []
         for msg in messages:
             # CHECK CATEGORY & SUBCATEGORY SUBSCRIPTION
             msg_channel_id = str(msg.get("channel_id"))
@@ -2386,8 +3040,16 @@ async def test_alerts(update: Update, context: ContextTypes.DEFAULT_TYPE):
             if not sm.is_subscribed(user_id, msg_category, msg_subcategory):
                 logger.debug(f"   ⏭️ Skipping test alert for {user_id}: {msg_category}/{msg_subcategory} unsubscribed")
                 continue
+            wanted.append(msg)
+
+        sem = asyncio.Semaphore(TEST_ALERT_CONCURRENCY)
+
+        async def _format(msg):
+            async with sem:
+                return await format_telegram_message(msg)
 
-            text, image_url, keyboard, image_bytes = format_telegram_message(msg)
+        async def _send(formatted):
+            text, image_url, keyboard, image_bytes = formatted
             
             # Prepare photo data once
             photo_data = image_url
@@ -2398,8 +3060,7 @@ async def test_alerts(update: Update, context: ContextTypes.DEFAULT_TYPE):
             elif image_url:
                 try:
                     # Fallback for unexpected cases where we have URL but no bytes
-                    loop = asyncio.get_event_loop()
-                    downloaded = await loop.run_in_executor(sync_executor, download_image_high_quality, image_url)
+                    downloaded = await download_image_high_quality(image_url)
                     if downloaded:
                         photo_data = BytesIO(downloaded)
                         logger.info(f"   ✅ Processed image via Pillow fallback ({len(downloaded)} bytes)")
@@ -2411,7 +3072,7 @@ async def test_alerts(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 try:
                     # If it's BytesIO, seek(0) to be safe for multiple users (though not needed here)
                     if isinstance(photo_data, BytesIO): photo_data.seek(0)
-                    
+                
                     await context.bot.send_photo(
                         chat_id=user_id,
                         photo=photo_data,
@@ -2419,7 +3080,7 @@ async def test_alerts(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         parse_mode=ParseMode.HTML,
                         reply_markup=keyboard
                     )
-                except Exception as e:
+                except TelegramError:
                      await context.bot.send_message(
                         chat_id=user_id,
                         text=f"Image failed: {text}",
@@ -2433,7 +3094,19 @@ async def test_alerts(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     parse_mode=ParseMode.HTML,
                     reply_markup=keyboard
                 )
-            await asyncio.sleep(0.5)
+            await asyncio.sleep(0.05)  # Small gap between sends to the same chat
+
+        # Format concurrently, send strictly in replay order (same pattern as _send_formatted)
+        format_tasks = [asyncio.create_task(_format(msg)) for msg in wanted]
+        try:
+            for msg, task in zip(wanted, format_tasks):
+                try:
+                    await _send(await task)
+                except Exception as e:
+                    logger.error(f"Test alert {msg.get('id')} failed: {e}")
+        finally:
+            for task in format_tasks:
+                task.cancel()
 
         await update.message.reply_text("✅ Test complete.")
 
@@ -2553,12 +3226,7 @@ async def billing_portal(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Stripe Customer Error: {e}")
         if "No such customer" in str(e):
             # Clean up stale ID
-            with sm.lock:
-                if "stripe_customer_id" in sm.users.get(user_id, {}):
-                    del sm.users[user_id]["stripe_customer_id"]
-                if "stripe_subscription_id" in sm.users.get(user_id, {}):
-                    del sm.users[user_id]["stripe_subscription_id"]
-                sm._sync_state()
+            sm.clear_stripe_ids(user_id)
             
             if msg:
                 await msg.reply_text("⚠️ Your subscription record was not found in Stripe (likely a Test/Live mismatch). I have reset your billing link. Please try /subscribe to link a valid account.")
@@ -2664,12 +3332,12 @@ async def link_app_account(update: Update, context: ContextTypes.DEFAULT_TYPE):
         print(f"[LINK] Key {link_key} marked as used for Telegram user {user_id}")
         
         # 7. Call the backend endpoint to complete the linking
-        import requests
         api_base = os.getenv("API_BASE_URL", "https://web-production-18cf1.up.railway.app")
         api_url = f"{api_base}/v1/user/telegram/link"
         
         try:
-            response = requests.post(
+            response = await asyncio.to_thread(
+                http_session.post,
                 api_url,
                 params={
                     "user_id": app_user_id,
@@ -2792,6 +3460,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Welcome message with main menu"""
     user_id = str(update.effective_user.id)
     username = update.effective_user.username or update.effective_user.first_name
+    sm.clear_unreachable(user_id)  # They reached us, so broadcasts can reach them again
     
     # Check for deep link parameter (from app)
     # Format: https://t.me/Bot?start=link_<USER_ID>
@@ -2841,31 +3510,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Track as potential user if not subscribed
     sm.track_potential_user(user_id, username)
     
-    welcome_text = f"""
-👋 <b>Welcome to Hollowscan!</b>
-
-<i>Hello {username}!</i> Get instant product alerts with all the data you need.
-
-🎯 <b>Features:</b>
-• Real-time deal notifications
-• Custom category preferences  
-• Premium tier for advanced features
-
-Use /settings to customize your alerts or /help for all commands.
-
-📊 <b>Status:</b>
-"""
-    
-    if sm.is_active(user_id):
-        stats = sm.get_user_stats(user_id)
-        welcome_text += f"✅ <b>Active</b> – {stats['days_remaining']} days remaining\n"
-        if stats['is_paused']:
-            welcome_text += "⏸️ Alerts currently paused\n"
-        
-        # Show tip only for active users
-        welcome_text += '\n💡 <b>Tip:</b> Click on "⚙️ <b>Alert Settings</b>" below to toggle ✅ on or ❌ off any country store you want to receive (or stop receiving) notifications from. Customize your experience!'
-    else:
-        welcome_text += "❌ <b>Not subscribed</b>\n\nRedeem a code or subscribe below to get started!\n"
+    welcome_text = _build_welcome_html(_WELCOME_INTRO_START, username, sm.get_user_snapshot(user_id))
 
     await update.message.reply_text(
         welcome_text,
@@ -2888,17 +3533,7 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         if menu_to_go == "main":
             # Show the same welcome content as /start
-            welcome_text = f"👋 <b>Welcome to Hollowscan!</b>\n\n<i>Hello {username}!</i> Get instant product alerts with all the data you need.\n\n🎯 <b>Features:</b>\n• ⚡️ Real-time notifications\n• 🖼️ Product images\n• 🔗 Direct action links\n• 📊 Full stock & price data\n• ⏸️ Pause/Resume anytime\n\n📊 <b>Status:</b>\n"
-            if sm.is_active(user_id):
-                stats = sm.get_user_stats(user_id)
-                welcome_text += f"✅ <b>Active</b> – {stats['days_remaining']} days remaining\n"
-                if stats['is_paused']:
-                    welcome_text += "⏸️ Alerts currently paused\n"
-                
-                # Show tip only for active users
-                welcome_text += '\n💡 <b>Tip:</b> Click on "⚙️ <b>Alert Settings</b>" below to toggle ✅ on or ❌ off any country store you want to receive (or stop receiving) notifications from. Customize your experience!'
-            else:
-                welcome_text += "❌ <b>Not subscribed</b>\n\nRedeem a code or subscribe below to get started!\n"
+            welcome_text = _build_welcome_html(_WELCOME_INTRO_MENU, username, sm.get_user_snapshot(user_id))
             
             try:
                 await query.edit_message_text(welcome_text, parse_mode=ParseMode.HTML, reply_markup=create_main_menu(user_id))
@@ -2921,10 +3556,10 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
     
     if action == "status":
-        if not sm.is_active(user_id):
+        stats = sm.get_user_snapshot(user_id)
+        if not stats["is_active"]:
             text = "❌ <b>Not Subscribed</b>\n\nUse /start to redeem a code!"
         else:
-            stats = sm.get_user_stats(user_id)
             text = f"""
 📊 <b>Your Subscription</b>
 
@@ -3249,6 +3884,11 @@ async def list_channels_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     await update.message.reply_text(text, parse_mode=ParseMode.HTML)
 
+# Noise/Restock patterns to filter (lowercase)
+_NOISE_PATTERNS = ("@currys +", "just restocked for")
+# Keywords that override filtering (instructions)
+_INSTRUCTION_KEYWORDS = ("refresh", "details", "access", "step", "tip", "screen", "wait")
+
 async def broadcast_job(context: ContextTypes.DEFAULT_TYPE):
     """
     Poll for new messages and broadcast with timeout protection.
@@ -3296,6 +3936,61 @@ async def broadcast_job(context: ContextTypes.DEFAULT_TYPE):
             job_start_time = None
 
 
+async def _send_reminders(context: ContextTypes.DEFAULT_TYPE, uids: List[str], text: str,
+                          mark_reminded, kind: str, who: str) -> int:
+    """Send a reminder to each uid, REMINDER_SEND_CONCURRENCY at a time. Returns how many were delivered.
+    Each send holds its slot (and a bot-wide telegram_send_slots() slot shared with broadcasts) for at least
+    a second, which keeps the bot under Telegram's ~30 msg/s limit.
+    mark_reminded takes the list of delivered/skipped uids and is called once for the whole sweep."""
+    sem = asyncio.Semaphore(REMINDER_SEND_CONCURRENCY)
+    markup = create_main_menu()  # No user id - the same keyboard for everyone
+    reminded: List[str] = []
+
+    async def _send_one(uid: str) -> bool:
+        async with sem, telegram_send_slots():
+            for attempt in range(2):
+                try:
+                    await asyncio.gather(
+                        context.bot.send_message(
+                            chat_id=uid,
+                            text=text,
+                            parse_mode=ParseMode.HTML,
+                            reply_markup=markup
+                        ),
+                        asyncio.sleep(1)
+                    )
+                    reminded.append(uid)
+                    return True
+                except RetryAfter as e:
+                    # Flood control - wait as told, then one retry
+                    if attempt:
+                        logger.error(f"Failed to send {kind} reminder to {uid}: {e}")
+                        return False
+                    await asyncio.sleep(e.retry_after)
+                except (Forbidden, BadRequest) as e:
+                    # Forbidden = blocked/deactivated; BadRequest covers chat/user not found
+                    if isinstance(e, Forbidden) or "not found" in e.message.lower():
+                        logger.warning(f"⏩ Skipping unreachable {who} {uid} for 14 days ({e})")
+                        reminded.append(uid)
+                    else:
+                        logger.error(f"Failed to send {kind} reminder to {uid}: {e}")
+                    return False
+                except TelegramError as e:
+                    logger.error(f"Failed to send {kind} reminder to {uid}: {e}")
+                    return False
+            return False
+
+    try:
+        results = await asyncio.gather(*(_send_one(uid) for uid in uids), return_exceptions=True)
+    finally:
+        # One copy-and-swap for the sweep; the finally keeps marks if the job is cancelled part-way
+        if reminded:
+            mark_reminded(reminded)
+    for uid, result in zip(uids, results):
+        if isinstance(result, Exception):
+            logger.error(f"Unexpected error sending {kind} reminder to {uid}: {type(result).__name__}: {result}")
+    return sum(result is True for result in results)
+
 async def expiry_reminder_job(context: ContextTypes.DEFAULT_TYPE):
     """Notify users with expired subscriptions once every two weeks"""
     expired_uids = sm.get_expired_users_needing_reminder()
@@ -3303,6 +3998,7 @@ async def expiry_reminder_job(context: ContextTypes.DEFAULT_TYPE):
         return
 
     logger.info(f"⏰ EXPIRY REMINDERS: Sending to {len(expired_uids)} user(s)")
+    now_iso = datetime.utcnow().isoformat()
     
     reminder_text = """
 ⚠️ <b>Subscription Expired</b>
@@ -3319,25 +4015,10 @@ To continue receiving real-time notifications with product images and direct lin
 <i>You will receive a reminder every two weeks.</i>
 """
     
-    sent = 0
-    for uid in expired_uids:
-        try:
-            await context.bot.send_message(
-                chat_id=uid,
-                text=reminder_text,
-                parse_mode=ParseMode.HTML,
-                reply_markup=create_main_menu()
-            )
-            sm.update_reminder_timestamp(uid)
-            sent += 1
-            await asyncio.sleep(0.1)  # Small delay between users
-        except Exception as e:
-            err_str = str(e).lower()
-            if "chat not found" in err_str or "bot was blocked" in err_str or "user not found" in err_str:
-                logger.warning(f"⏩ Skipping unreachable user {uid} for 14 days ({e})")
-                sm.update_reminder_timestamp(uid)
-            else:
-                logger.error(f"Failed to send expiry reminder to {uid}: {e}")
+    sent = await _send_reminders(
+        context, expired_uids, reminder_text,
+        lambda uids: sm.update_reminder_timestamps(uids, now_iso), "expiry", "user"
+    )
             
     if sent > 0:
         logger.info(f"✅ Sent {sent} expiry reminder(s)")
@@ -3349,6 +4030,7 @@ async def potential_user_reminder_job(context: ContextTypes.DEFAULT_TYPE):
         return
 
     logger.info(f"⏰ POTENTIAL USER REMINDERS: Sending to {len(potential_uids)} user(s)")
+    now_iso = datetime.utcnow().isoformat()
     
     reminder_text = """
 👋 <b>Ready to get started?</b>
@@ -3368,25 +4050,10 @@ You recently checked out Hollowscan but haven't activated your subscription yet.
 <i>You will receive a reminder every two weeks.</i>
 """
     
-    sent = 0
-    for uid in potential_uids:
-        try:
-            await context.bot.send_message(
-                chat_id=uid,
-                text=reminder_text,
-                parse_mode=ParseMode.HTML,
-                reply_markup=create_main_menu()
-            )
-            sm.update_potential_reminder_timestamp(uid)
-            sent += 1
-            await asyncio.sleep(0.1)
-        except Exception as e:
-            err_str = str(e).lower()
-            if "chat not found" in err_str or "bot was blocked" in err_str or "user not found" in err_str:
-                logger.warning(f"⏩ Skipping unreachable potential user {uid} for 14 days ({e})")
-                sm.update_potential_reminder_timestamp(uid)
-            else:
-                logger.error(f"Failed to send potential reminder to {uid}: {e}")
+    sent = await _send_reminders(
+        context, potential_uids, reminder_text,
+        lambda uids: sm.update_potential_reminder_timestamps(uids, now_iso), "potential", "potential user"
+    )
             
     if sent > 0:
         logger.info(f"✅ Sent {sent} potential user reminder(s)")
@@ -3410,11 +4077,6 @@ async def _broadcast_job_inner(context: ContextTypes.DEFAULT_TYPE):
     
     # Filter out duplicate sources, unwanted restock alerts, and noisy patterns
     filtered_msgs = []
-    
-    # Noise/Restock patterns to filter
-    NOISE_PATTERNS = ["@Currys +", "Just restocked for"]
-    # Keywords that override filtering (instructions)
-    INSTRUCTION_KEYWORDS = ["refresh", "details", "access", "step", "tip", "screen", "wait"]
 
     for msg in new_msgs:
         # LAYER A: Existing filters (Duplicate source/Restock filter)
@@ -3423,8 +4085,8 @@ async def _broadcast_job_inner(context: ContextTypes.DEFAULT_TYPE):
             
         # LAYER B: Aggressive Duplicate Content Check (If Title == Description/Content)
         # We check this before formatting to save CPU
-        raw = msg.get("raw_data", {})
-        embed = raw.get("embed") or {}
+        raw = msg.get("raw_data") or _EMPTY_DICT
+        embed = raw.get("embed") or _EMPTY_DICT
         title = (embed.get("title") or "").strip().lower()
         desc = (embed.get("description") or "").strip().lower()
         content = (msg.get("content") or "").strip().lower()
@@ -3434,10 +4096,11 @@ async def _broadcast_job_inner(context: ContextTypes.DEFAULT_TYPE):
             continue
 
         # LAYER C: Noisy Mass-Restock Alerts (e.g. Currys)
-        # We don't filter if it looks like an instruction
-        is_instruction = any(kw in (desc + content).lower() for kw in INSTRUCTION_KEYWORDS)
+        # We don't filter if it looks like an instruction (desc/content are already lowercased)
+        body = desc + content
+        is_instruction = any(kw in body for kw in _INSTRUCTION_KEYWORDS)
         if not is_instruction:
-            is_noise = any(pattern.lower() in (desc + content).lower() for pattern in NOISE_PATTERNS)
+            is_noise = any(pattern in body for pattern in _NOISE_PATTERNS)
             if is_noise:
                 logger.info(f"⏭️ FILTERED: Noisy restock pattern ({msg.get('id')})")
                 continue
@@ -3455,7 +4118,9 @@ async def _broadcast_job_inner(context: ContextTypes.DEFAULT_TYPE):
         return
     
     # Get active users
-    active_users = sm.get_active_users()
+    # One snapshot for the whole job; chats known to be unreachable are dropped up front
+    now = datetime.utcnow()
+    active_users = tuple(uid for uid in sm.get_active_users() if not sm.is_unreachable(uid, now))
     
     if not active_users:
         logger.warning(f"⚠️  BROADCAST BLOCKED: No active users!")
@@ -3465,158 +4130,215 @@ async def _broadcast_job_inner(context: ContextTypes.DEFAULT_TYPE):
     
     logger.info(f"📤 BROADCAST: {len(filtered_msgs)} message(s) → {len(active_users)} active user(s)")
     
-    # Process messages with batching
-    for msg_idx, msg in enumerate(filtered_msgs):
-        try:
-            logger.debug(f"   🔨 Formatting message {msg_idx + 1}/{len(filtered_msgs)}...")
-            text, image_url, keyboard, image_bytes = format_telegram_message(msg)
-            logger.debug(f"   ✓ Formatted (text={len(text)} chars, image={'yes' if image_url else 'no'})")
-            
+    # Pipeline: formatting (image checks/scrapes) runs ahead in background tasks while
+    # the loop below sends each message in order as soon as its own format is done
+    format_sem = asyncio.Semaphore(FORMAT_CONCURRENCY)
+    
+    async def _format(msg_idx: int, msg: Dict):
+        async with format_sem:
+            logger.debug("   🔨 Formatting message %d/%d...", msg_idx + 1, len(filtered_msgs))
+            return await format_telegram_message(msg)
+    
+    format_tasks = [asyncio.create_task(_format(msg_idx, msg)) for msg_idx, msg in enumerate(filtered_msgs)]
+    try:
+        await _send_formatted(context, filtered_msgs, format_tasks, active_users)
+    finally:
+        # Broadcast timeout or error - don't leave formatting running in the background
+        for task in format_tasks:
+            task.cancel()
+
+
+async def _send_formatted(context: ContextTypes.DEFAULT_TYPE, filtered_msgs: List[Dict],
+                          format_tasks: List[asyncio.Task], active_users: Tuple[str, ...]):
+    """Send each message (in poll order) once its format task finishes, advancing the cursor"""
+    send_sem = asyncio.Semaphore(BROADCAST_SEND_CONCURRENCY)
+    unreachable: List[str] = []  # Blocked chats found while sending, marked in one batch per message
+    
+    async def _send_one(uid: str, photo_data, text: str, caption: str, keyboard) -> bool:
+        # Each send holds its slot for at least a second; the bot-wide slots are shared with reminder
+        # sweeps, so both jobs running at once still stay under Telegram's ~30 msg/s limit
+        async with send_sem, telegram_send_slots():
+            delivered, _ = await asyncio.gather(
+                _broadcast_to_user(context, uid, photo_data, text, caption, keyboard, unreachable=unreachable),
+                asyncio.sleep(1)
+            )
+            return delivered is not None
+    
+    # Cursor is applied once per job (one save request and log line, not one per message);
+    # the finally keeps progress if the job times out part-way through
+    sent_through: Optional[Tuple[str, Dict]] = None
+    try:
+        for msg_idx, (msg, format_task) in enumerate(zip(filtered_msgs, format_tasks)):
+            try:
+                result = await format_task
+            except Exception as e:
+                logger.error(f"   ❌ Failed to format message {msg_idx + 1}: {type(e).__name__}: {e}")
+                continue
+        
+            text, image_url, keyboard, image_bytes = result
+            # Debug lines in this loop use lazy %-args - they're dropped at INFO, so don't build them
+            logger.debug("   ✓ Formatted (text=%d chars, image=%s)", len(text), "yes" if image_url else "no")
+        
             # Validate message is not empty
-            if not text or len(text.strip()) == 0:
+            if not text or text.isspace():
                 continue
-            
-        except Exception as e:
-            logger.error(f"   ❌ Failed to format message {msg_idx + 1}: {type(e).__name__}: {e}")
-            continue
         
-        # Prepare photo data once per message
-        photo_data = image_url
-        if image_bytes:
-            # Reuse pre-verified bytes from formatting step
-            photo_data = image_bytes
-            logger.info(f"   ✅ Using pre-verified message image bytes ({len(image_bytes)} bytes)")
-        elif image_url:
-            try:
-                # Fallback for unexpected cases
-                loop = asyncio.get_event_loop()
-                downloaded = await loop.run_in_executor(sync_executor, download_image_high_quality, image_url)
-                if downloaded:
-                    photo_data = downloaded
-                    logger.info(f"   ✅ Processed message image via Pillow fallback ({len(downloaded)} bytes)")
-            except Exception as e:
-                logger.warning(f"   ⚠️ Pillow processing failed: {e}")
+            # Prepare photo data once per message
+            photo_data = image_url
+            if image_bytes:
+                # Reuse pre-verified bytes from formatting step
+                photo_data = image_bytes
+                logger.info(f"   ✅ Using pre-verified message image bytes ({len(image_bytes)} bytes)")
+            elif image_url:
+                try:
+                    # Fallback for unexpected cases
+                    downloaded = await download_image_high_quality(image_url)
+                    if downloaded:
+                        photo_data = downloaded
+                        logger.info(f"   ✅ Processed message image via Pillow fallback ({len(downloaded)} bytes)")
+                except Exception as e:
+                    logger.warning(f"   ⚠️ Pillow processing failed: {e}")
 
-        # Send to all active users with rate limiting
-        sent_count = 0
-        failed_count = 0
+            # Determine Category & Subcategory
+            msg_channel_id = str(msg.get("channel_id"))
+            msg_category = "Uncategorized"
+            msg_subcategory = "Unknown"
+            for c in cm.channels:
+                if c['id'] == msg_channel_id:
+                    msg_category = c.get('category', 'Uncategorized')
+                    msg_subcategory = c.get('name', 'Unknown')
+                    break
         
-        # Determine Category & Subcategory
-        msg_channel_id = str(msg.get("channel_id"))
-        msg_category = "Uncategorized"
-        msg_subcategory = "Unknown"
-        for c in cm.channels:
-            if c['id'] == msg_channel_id:
-                msg_category = c.get('category', 'Uncategorized')
-                msg_subcategory = c.get('name', 'Unknown')
-                break
+            # Send to all subscribed active users concurrently, BROADCAST_SEND_CONCURRENCY at a time
+            # Re-check unreachable: earlier messages in this job may have found more blocked chats
+            now = datetime.utcnow()
+            recipients = [
+                uid for uid in active_users
+                if not sm.is_unreachable(uid, now) and sm.is_subscribed(uid, msg_category, msg_subcategory)
+            ]
+            caption = text[:1024]  # Sliced once - every recipient gets the same payload objects
+            first_results = []
+            if isinstance(photo_data, bytes) and recipients:
+                # Upload the image once; everyone else gets Telegram's file_id instead of a fresh upload
+                async with telegram_send_slots():
+                    first = await _broadcast_to_user(context, recipients[0], photo_data, text, caption, keyboard,
+                                                     unreachable=unreachable)
+                first_results.append(first is not None)
+                if first is not None and first.photo:
+                    photo_data = first.photo[-1].file_id
+                recipients = recipients[1:]
+            results = await asyncio.gather(
+                *(_send_one(uid, photo_data, text, caption, keyboard) for uid in recipients),
+                return_exceptions=True
+            )
+            for uid, result in zip(recipients, results):
+                if isinstance(result, Exception):
+                    logger.error(f"   ❌ {uid}: {type(result).__name__}: {result}")
+            if unreachable:
+                # Before the next message's recipient filter, which skips them
+                sm.mark_unreachable_many(unreachable)
+                unreachable.clear()
+            results = first_results + results
+            sent_count = sum(result is True for result in results)
+            failed_count = len(results) - sent_count
         
-        # Send to all active users with rate limiting
-        sent_count = 0
-        failed_count = 0
+            logger.info(f"   📊 Message {msg_idx + 1}: ✅ {sent_count} sent, ❌ {failed_count} failed")
         
-        for uid in active_users:
-            # CHECK SUBSCRIPTION
-            if not sm.is_subscribed(uid, msg_category, msg_subcategory):
-                continue
+            # Advance the cursor ONLY past messages that reached someone
+            # This ensures failed messages are retried on next poll
+            if sent_count > 0:  # At least one user received it
+                msg_scraped_at = msg.get("scraped_at")
+                if msg_scraped_at:
+                    sent_through = (msg_scraped_at, msg)
+    finally:
+        if unreachable:
+            sm.mark_unreachable_many(unreachable)
+        if sent_through:
+            poller.update_cursor(*sent_through)
+
+
+def _note_unreachable(uid: str, unreachable: Optional[List[str]]):
+    """Queue a blocked chat on the caller's batch, or mark it right away without one"""
+    if unreachable is None:
+        sm.mark_unreachable(uid)
+    else:
+        unreachable.append(uid)
 
+
+async def _broadcast_to_user(context: ContextTypes.DEFAULT_TYPE, uid: str, photo_data, text: str,
+                             caption: str, keyboard, retry: bool = True,
+                             unreachable: Optional[List[str]] = None) -> Optional[Message]:
+    """Deliver one broadcast message (photo, falling back to text). Returns the sent message, or None.
+    On flood control it waits as long as Telegram asks and retries once (retry=False on that attempt).
+    unreachable: collects blocked/deleted chats for the caller to mark in one batch (marked here if None)."""
+    try:
+        # Timeouts are enforced by PTB's HTTP layer (raises TimedOut) - no wait_for timer per send
+        if photo_data:
             try:
-                # Send with timeout protection
-                if photo_data:
-                    try:
-                        # Prepare the payload (BytesIO if we have raw bytes)
-                        current_photo = photo_data
-                        if isinstance(photo_data, bytes):
-                            current_photo = BytesIO(photo_data)
-                            
-                        await asyncio.wait_for(
-                            context.bot.send_photo(
-                                chat_id=uid,
-                                photo=current_photo,
-                                caption=text[:1024],
-                                parse_mode=ParseMode.HTML,
-                                reply_markup=keyboard
-                            ),
-                            timeout=12.0
-                        )
-                        sent_count += 1
-                        
-                    except asyncio.TimeoutError:
-                        logger.warning(f"   ⏱️  {uid}: Photo send timeout")
-                        # Fallback to text
-                        await asyncio.wait_for(
-                            context.bot.send_message(
-                                chat_id=uid,
-                                text=text,
-                                parse_mode=ParseMode.HTML,
-                                reply_markup=keyboard,
-                                disable_web_page_preview=False
-                            ),
-                            timeout=10.0
-                        )
-                        sent_count += 1
-                        
-                    except Exception as photo_error:
-                        logger.error(f"   ❌ {uid}: Photo failed - {type(photo_error).__name__}")
-                        # Fallback to text
-                        try:
-                            await asyncio.wait_for(
-                                context.bot.send_message(
-                                    chat_id=uid,
-                                    text=text,
-                                    parse_mode=ParseMode.HTML,
-                                    reply_markup=keyboard,
-                                    disable_web_page_preview=False
-                                ),
-                                timeout=10.0
-                            )
-                            sent_count += 1
-                        except:
-                            failed_count += 1
-                else:
-                    # Text-only
-                    await asyncio.wait_for(
-                        context.bot.send_message(
-                            chat_id=uid,
-                            text=text,
-                            parse_mode=ParseMode.HTML,
-                            reply_markup=keyboard,
-                            disable_web_page_preview=False
-                        ),
-                        timeout=10.0
-                    )
-                    sent_count += 1
-            
-            except asyncio.TimeoutError:
-                logger.warning(f"   ⏱️  {uid}: Message send timeout")
-                failed_count += 1
+                # Prepare the payload (BytesIO if we have raw bytes). One per send on purpose: sends run
+                # concurrently, so a shared stream's position would race. BytesIO over bytes shares the
+                # buffer rather than copying it, and after the first upload photo_data is a file_id anyway
+                current_photo = photo_data
+                if isinstance(photo_data, bytes):
+                    current_photo = BytesIO(photo_data)
+                    
+                return await context.bot.send_photo(
+                    chat_id=uid,
+                    photo=current_photo,
+                    caption=caption,
+                    parse_mode=ParseMode.HTML,
+                    reply_markup=keyboard,
+                    read_timeout=BROADCAST_PHOTO_TIMEOUT,
+                    write_timeout=BROADCAST_PHOTO_TIMEOUT
+                )
                 
-            except Exception as e:
-                error_str = str(e)
-                if "user not found" in error_str.lower() or "chat_id_invalid" in error_str.lower():
-                    logger.warning(f"   ⛔ {uid}: User invalid/blocked")
-                elif "bot was blocked" in error_str.lower():
-                    logger.warning(f"   🚫 {uid}: Bot blocked by user")
-                elif "badrequest" in error_str.lower():
-                    # Log full error for BadRequest to diagnose formatting issues
-                    logger.error(f"   ❌ {uid}: BadRequest - {error_str}")
-                    logger.error(f"      Message preview: {text[:200]}...")
-                else:
-                    logger.error(f"   ❌ {uid}: {type(e).__name__}: {error_str}")
-                failed_count += 1
-            
-            # Rate limit protection - small delay between users
-            await asyncio.sleep(0.05)
+            except TimedOut:
+                logger.warning(f"   ⏱️  {uid}: Photo send timeout")
+            except (Forbidden, RetryAfter):
+                raise  # Text won't get through either
+            except TelegramError as photo_error:
+                logger.error(f"   ❌ {uid}: Photo failed - {type(photo_error).__name__}")
+        
+        # Text-only, or fallback after a failed photo
+        return await context.bot.send_message(
+            chat_id=uid,
+            text=text,
+            parse_mode=ParseMode.HTML,
+            reply_markup=keyboard,
+            disable_web_page_preview=False,
+            read_timeout=BROADCAST_TEXT_TIMEOUT,
+            write_timeout=BROADCAST_TEXT_TIMEOUT
+        )
+    
+    except TimedOut:
+        logger.warning(f"   ⏱️  {uid}: Message send timeout")
+        
+    except RetryAfter as e:
+        if not retry:
+            logger.error(f"   ❌ {uid}: Still rate limited after waiting - {e}")
+            return None
+        logger.warning(f"   ⏳ {uid}: Flood control, retrying in {e.retry_after}s")
+        await asyncio.sleep(e.retry_after)
+        return await _broadcast_to_user(context, uid, photo_data, text, caption, keyboard, retry=False,
+                                        unreachable=unreachable)
         
-        logger.info(f"   📊 Message {msg_idx + 1}: ✅ {sent_count} sent, ❌ {failed_count} failed")
+    except Forbidden:
+        # Blocked the bot or deactivated - skipped until they /start again (or the weekly retry)
+        logger.warning(f"   🚫 {uid}: Bot blocked by user")
+        _note_unreachable(uid, unreachable)
         
-        # Update cursor ONLY after successful processing of this message
-        # This ensures failed messages are retried on next poll
-        if sent_count > 0:  # At least one user received it
-            msg_scraped_at = msg.get("scraped_at")
-            if msg_scraped_at:
-                poller.update_cursor(msg_scraped_at, msg)
-                logger.debug(f"   📌 Cursor updated to: {msg_scraped_at}")
+    except BadRequest as e:
+        if "not found" in e.message.lower():
+            logger.warning(f"   ⛔ {uid}: User invalid/blocked")
+            _note_unreachable(uid, unreachable)
+        else:
+            # Log full error for BadRequest to diagnose formatting issues
+            logger.error(f"   ❌ {uid}: BadRequest - {e.message}")
+            logger.error(f"      Message preview: {text[:200]}...")
+            
+    except TelegramError as e:
+        logger.error(f"   ❌ {uid}: {type(e).__name__}: {e}")
+    return None
 
 # 4. COMMAND MENU SETUP
 
@@ -3655,37 +4377,27 @@ async def setup_bot_commands(context: ContextTypes.DEFAULT_TYPE) -> None:
     application = context.application
     try:
         logger.info("🛠️ Setting up command menus...")
-        # 1. Set default commands for all users
-        await application.bot.set_my_commands(DEFAULT_COMMANDS, scope=BotCommandScopeDefault())
-        logger.info("   ✅ Default command menu set")
-        
-        # 2. Set SUPERADMIN_COMMANDS for IDs in .env
+        # (label, commands, scope): default menu, SUPERADMIN_COMMANDS for IDs in .env,
+        # then ADMIN_COMMANDS for secondary admins managed by the bot
+        menus = [("Default command menu", DEFAULT_COMMANDS, BotCommandScopeDefault())]
         for admin_id in ADMIN_USER_IDS:
-            try:
-                await application.bot.set_my_commands(
-                    SUPERADMIN_COMMANDS, 
-                    scope=BotCommandScopeChat(chat_id=int(admin_id))
-                )
-                logger.info(f"   ✅ Superadmin menu set for .env user {admin_id}")
-            except Exception as e:
-                logger.debug(f"   Could not set superadmin menu for {admin_id}: {e}")
-
-        # 3. Set ADMIN_COMMANDS for secondary admins Managed by bot
-        for user_id, user_data in sm.users.items():
-            if user_id in ADMIN_USER_IDS: continue # Skip if already set as superadmin
-            
-            if user_data.get("is_admin", False):
-                try:
-                    await application.bot.set_my_commands(
-                        ADMIN_COMMANDS, 
-                        scope=BotCommandScopeChat(chat_id=int(user_id))
-                    )
-                    logger.info(f"   ✅ Admin menu set for user {user_id}")
-                except Exception as e:
-                    logger.debug(f"   Could not set admin menu for {user_id}: {e}")
-                
-                # Small delay to avoid rate limits
-                await asyncio.sleep(0.5)
+            menus.append((f"Superadmin menu for .env user {admin_id}", SUPERADMIN_COMMANDS,
+                          BotCommandScopeChat(chat_id=int(admin_id))))
+        for user_id in sm.bot_admin_ids:
+            if user_id in _ADMIN_USER_ID_SET: continue # Skip if already set as superadmin
+            menus.append((f"Admin menu for user {user_id}", ADMIN_COMMANDS,
+                          BotCommandScopeChat(chat_id=int(user_id))))
+        
+        # All scopes are independent, so set them in one round trip
+        results = await asyncio.gather(
+            *(application.bot.set_my_commands(commands, scope=scope) for _, commands, scope in menus),
+            return_exceptions=True
+        )
+        for (label, _, _), result in zip(menus, results):
+            if isinstance(result, Exception):
+                logger.debug(f"   Could not set {label}: {result}")
+            else:
+                logger.info(f"   ✅ {label} set")
                 
     except Exception as e:
         logger.error(f"   ❌ Failed to set command menus: {e}")
@@ -4080,7 +4792,7 @@ async def show_help(update: Update, context: ContextTypes.DEFAULT_TYPE):
 /add_admin [user_id] - Add an admin
 /remove_admin [user_id] - Remove an admin
 """
-    elif is_admin(user_id):
+    elif sm.is_bot_admin(user_id):  # Superadmins already handled above
         menu_text = """
 🎛️ <b>Admin Commands</b>
 
@@ -4157,13 +4869,24 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
 # 5. RUN BOT FUNCTION
 def run_bot():
     """Run bot with professional alert system (Resilient version)"""
-    import nest_asyncio
-    nest_asyncio.apply()
-    
-    # Create a fresh event loop for this thread to avoid loop conflicts
-    loop = asyncio.new_event_loop()
+    # Create a fresh event loop for this thread to avoid loop conflicts.
+    # uvloop when installed (not on Windows) - only this thread's loop, Flask's side is untouched
+    try:
+        import uvloop
+        loop = uvloop.new_event_loop()
+        logger.info("⚡ Using uvloop event loop")
+    except ImportError:
+        loop = asyncio.new_event_loop()
+        # Stdlib fallback keeps the original nest_asyncio patch, applied to this loop only.
+        # Skipped for uvloop: it can't patch a uvloop loop, yet apply() would still swap the global
+        # asyncio Task/Future for pure-Python versions - and the bot never nests run_until_complete
+        import nest_asyncio
+        nest_asyncio.apply(loop)
     asyncio.set_event_loop(loop)
     
+    # This process owns the cursor from here on
+    poller.start_sync()
+    
     retry_count = 0
     max_retries = 3
     
@@ -4179,7 +4902,14 @@ def run_bot():
             logger.info(f"   Token: {TELEGRAM_TOKEN[:15]}...***{TELEGRAM_TOKEN[-5:]}")
             logger.info(f"   Admin ID: {ADMIN_USER_ID}")
             
-            app = Application.builder().token(TELEGRAM_TOKEN).build()
+            app = (
+                Application.builder()
+                .token(TELEGRAM_TOKEN)
+                .connection_pool_size(TELEGRAM_POOL_SIZE)
+                .pool_timeout(TELEGRAM_POOL_TIMEOUT)
+                .post_shutdown(close_image_client)
+                .build()
+            )
             
             # --- Handler Registration ---
             # Broadcast Handler
@@ -16,8 +16,29 @@ print("=" * 80)
 # Import Flask app first
 from app import app
 
+_bot_lock_file = None  # Held open for the worker's lifetime; the OS drops the lock if it dies
+
+def claim_bot_lock():
+    """Only one Gunicorn worker per host may poll Telegram - a second getUpdates
+    on the same token gets 409 Conflict and the two pollers keep kicking each other off."""
+    global _bot_lock_file
+    try:
+        import fcntl
+    except ImportError:
+        return True  # Windows dev runs a single process anyway
+    _bot_lock_file = open(os.getenv("TELEGRAM_BOT_LOCK", "/tmp/telegram_bot.lock"), "w")
+    try:
+        fcntl.flock(_bot_lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        _bot_lock_file.close()
+        _bot_lock_file = None
+        return False
+
 # Start Telegram Bot in background thread
-if os.getenv("TELEGRAM_TOKEN"):
+if os.getenv("TELEGRAM_TOKEN") and not claim_bot_lock():
+    print(f"\nℹ️  Telegram bot already running in another worker - skipping (pid {os.getpid()})")
+elif os.getenv("TELEGRAM_TOKEN"):
     import telegram_bot
     
     def run_telegram_safe():